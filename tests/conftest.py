@@ -0,0 +1,118 @@
+# pyright: basic
+"""Shared fixtures for the WR CLI test suite."""
+
+import copy
+from unittest.mock import Mock
+
+import pytest
+from click.testing import CliRunner
+from rich.console import Console
+
+from wr_cli.setup.utils import clear_command_cache
+
+VALID_CONFIG = """
+project_name: test-project
+commands:
+  test: ":"
+"""
+
+INVALID_CONFIG = "invalid: yaml: content: ["
+
+# Attribute names of Console, computed once so each mock skips the dir() walk
+_CONSOLE_DIR = dir(Console)
+
+# What load_config returns for VALID_CONFIG, kept so tests can skip the parse
+PARSED_VALID_CONFIG = {
+    "project_name": "test-project",
+    "commands": {"test": ":"},
+}
+
+
+@pytest.fixture(scope="session")
+def valid_config_path(tmp_path_factory):
+    """Path to a valid wr.yml written once per session."""
+    config_path = tmp_path_factory.mktemp("cfg") / "wr.yml"
+    config_path.write_text(VALID_CONFIG)
+    return str(config_path)
+
+
+@pytest.fixture(scope="session")
+def invalid_config_path(tmp_path_factory):
+    """Path to a wr.yml containing invalid YAML, written once per session."""
+    config_path = tmp_path_factory.mktemp("cfg") / "wr.yml"
+    config_path.write_text(INVALID_CONFIG)
+    return str(config_path)
+
+
+@pytest.fixture
+def parsed_config():
+    """Fresh copy of the parsed VALID_CONFIG."""
+    return copy.deepcopy(PARSED_VALID_CONFIG)
+
+
+@pytest.fixture
+def stub_load_config(monkeypatch):
+    """Make the CLI return the parsed VALID_CONFIG without reading YAML."""
+    monkeypatch.setattr(
+        "wr_cli.main.load_config_cached",
+        lambda path: copy.deepcopy(PARSED_VALID_CONFIG),
+    )
+
+
+@pytest.fixture(scope="session")
+def cli_runner():
+    """Click test runner shared across the session."""
+    return CliRunner()
+
+
+@pytest.fixture(autouse=True)
+def _isolated_cache_dir(tmp_path, monkeypatch):
+    """Point the WR CLI cache at a per-test directory instead of ~/.cache."""
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+
+
+@pytest.fixture(autouse=True)
+def _fresh_command_cache():
+    """Start and end every test without cached command lookups.
+
+    Setup runs resolve commands into module-level caches, which would
+    otherwise carry host-specific results from one test into the next.
+    """
+    clear_command_cache()
+    yield
+    clear_command_cache()
+
+
+@pytest.fixture(autouse=True)
+def mock_subproc_run(request, monkeypatch):
+    """Replace subprocess.run with a Mock so tests never spawn real processes.
+
+    subprocess.Popen, which ``wr run`` uses to stream output, is replaced
+    with a Mock that fails the test, so a missing Popen stub is caught
+    rather than spawning a real process. Tests that really need to spawn a
+    process opt out with ``@pytest.mark.real_subprocess``.
+    """
+    if request.node.get_closest_marker("real_subprocess"):
+        return None
+    mock_run = Mock(return_value=Mock(stdout="", stderr="", returncode=0))
+    monkeypatch.setattr("subprocess.run", mock_run)
+    monkeypatch.setattr(
+        "subprocess.Popen",
+        Mock(side_effect=AssertionError("test spawned a real process")),
+    )
+    return mock_run
+
+
+@pytest.fixture(scope="session")
+def _console_template():
+    """Console mock built once per session and shared by every test."""
+    return Mock(spec_set=_CONSOLE_DIR)
+
+
+@pytest.fixture
+def console(_console_template):
+    """Mock Rich console for asserting on printed output, reset for each test."""
+    _console_template.reset_mock(return_value=True, side_effect=True)
+    # Like a real Console, a capture with nothing printed to it is empty
+    _console_template.end_capture.return_value = ""
+    return _console_template
@@ -0,0 +1,59 @@
+# pyright: basic
+"""Tests for the on-disk cache helpers."""
+
+from pathlib import Path
+
+from wr_cli import cache
+
+
+def test_cache_dir_uses_xdg_cache_home(tmp_path, monkeypatch):
+    """Test the cache lives under $XDG_CACHE_HOME when it is set."""
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    assert cache.cache_dir() == tmp_path / "wr-cli"
+
+
+def test_cache_dir_defaults_to_home(tmp_path, monkeypatch):
+    """Test the cache falls back to ~/.cache when $XDG_CACHE_HOME is unset."""
+    monkeypatch.delenv("XDG_CACHE_HOME", raising=False)
+    monkeypatch.setattr(Path, "home", lambda: tmp_path)
+    assert cache.cache_dir() == tmp_path / ".cache" / "wr-cli"
+
+
+def test_write_then_read_json():
+    """Test data written to the cache reads back unchanged."""
+    cache.write_json("data.json", {"node": ["v18.17.0", 1]})
+    assert cache.read_json("data.json") == {"node": ["v18.17.0", 1]}
+    # Only the cache file is left behind, no temporary files
+    assert [p.name for p in cache.cache_dir().iterdir()] == ["data.json"]
+
+
+def test_read_json_missing_or_corrupt():
+    """Test unreadable cache files read as None."""
+    assert cache.read_json("missing.json") is None
+
+    cache.cache_dir().mkdir(parents=True)
+    (cache.cache_dir() / "corrupt.json").write_text("{not json")
+    assert cache.read_json("corrupt.json") is None
+
+
+def test_write_json_ignores_unwritable_cache(tmp_path, monkeypatch):
+    """Test a cache directory that cannot be created is silently skipped."""
+    (tmp_path / "file").write_text("")
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "file"))
+    cache.write_json("data.json", {})
+    assert cache.read_json("data.json") is None
+
+
+def test_remove():
+    """Test remove deletes a cache file and tolerates a missing one."""
+    cache.write_json("data.json", {})
+    cache.remove("data.json")
+    assert cache.read_json("data.json") is None
+    cache.remove("data.json")
+
+
+def test_write_json_ignores_unserializable_data():
+    """Test data JSON can't represent is skipped without leaving files behind."""
+    cache.write_json("data.json", {"when": object()})
+    assert cache.read_json("data.json") is None
+    assert list(cache.cache_dir().iterdir()) == []
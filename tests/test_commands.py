@@ -1,85 +1,138 @@
 # pyright: basic
 """Tests for command execution functionality."""
 
+import io
+import os
+import re
 import subprocess
-import sys
-from unittest.mock import MagicMock, patch
+from unittest.mock import MagicMock, Mock, call
 
 import pytest
-from rich.console import Console
 
 from wr_cli.commands import run_command
 
+_ERR_MISSING = re.compile(
+    r"Command 'missing' not found\. Available commands: test, build"
+)
+_ERR_NO_COMMANDS = re.compile(r"Command 'test' not found\. Available commands:")
+
+_EXPECTED_SUCCESS = (
+    call("[blue]Running:[/blue] echo 'Hello World'"),
+    call("Hello World\n", end=""),
+    call("[green]✓ Command 'test' completed successfully[/green]"),
+)
+_PIPES = {"stdout": subprocess.PIPE, "stderr": subprocess.PIPE, "text": True}
+
+
+def _fake_process(stdout="", stderr="", returncode=0):
+    """Build a stand-in for a Popen object with the given output."""
+    process = MagicMock()
+    process.__enter__.return_value = process
+    process.stdout = io.StringIO(stdout)
+    process.stderr = io.StringIO(stderr)
+    process.wait.return_value = returncode
+    return process
+
+
+@pytest.fixture
+def mock_popen(monkeypatch):
+    """Replace subprocess.Popen with a Mock returning a silent, successful process."""
+    mock = Mock(return_value=_fake_process())
+    monkeypatch.setattr("subprocess.Popen", mock)
+    return mock
+
 
 class TestRunCommand:
     """Test the run_command function."""
 
-    def test_run_command_success(self):
+    def test_run_command_success(self, mock_popen, console):
         """Test successful command execution."""
         config = {
             "commands": {
                 "test": "echo 'Hello World'"
             }
         }
-        console = MagicMock(spec=Console)
-        
-        with patch("subprocess.run") as mock_run:
-            mock_result = MagicMock()
-            mock_result.stdout = "Hello World\n"
-            mock_result.returncode = 0
-            mock_run.return_value = mock_result
-            
-            run_command("test", config, console)
-            
-            # Verify subprocess.run was called correctly
-            mock_run.assert_called_once_with(
-                "echo 'Hello World'",
-                shell=True,
-                check=True,
-                text=True,
-                capture_output=True,
-            )
-            
-            # Verify console output
-            expected_calls = [
-                (("[blue]Running:[/blue] echo 'Hello World'",), {}),
-                (("Hello World\n",), {}),
-                (("[green]✓ Command 'test' completed successfully[/green]",), {})
-            ]
-            assert console.print.call_count == 3
-            for i, (expected_args, expected_kwargs) in enumerate(expected_calls):
-                actual_call = console.print.call_args_list[i]
-                assert actual_call.args == expected_args
-                assert actual_call.kwargs == expected_kwargs
-
-    def test_run_command_success_no_stdout(self):
+        
+        mock_popen.return_value = _fake_process(stdout="Hello World\n")
+        
+        run_command("test", config, console)
+        
+        # A simple command runs directly, without an intermediate shell
+        mock_popen.assert_called_once_with(["echo", "Hello World"], **_PIPES)
+        
+        # Verify console output
+        console.print.assert_has_calls(_EXPECTED_SUCCESS)
+        assert console.print.call_count == len(_EXPECTED_SUCCESS)
+
+    def test_run_command_streams_each_line(self, mock_popen, console):
+        """Test stdout is printed line by line as the command produces it."""
+        mock_popen.return_value = _fake_process(stdout="one\ntwo\n")
+        
+        run_command("test", {"commands": {"test": "seq"}}, console)
+        
+        console.print.assert_has_calls([call("one\n", end=""), call("two\n", end="")])
+
+    def test_run_command_success_no_stdout(self, mock_popen, console):
         """Test successful command execution with no stdout."""
         config = {
             "commands": {
                 "silent": "exit 0"
             }
         }
-        console = MagicMock(spec=Console)
-        
-        with patch("subprocess.run") as mock_run:
-            mock_result = MagicMock()
-            mock_result.stdout = ""
-            mock_result.returncode = 0
-            mock_run.return_value = mock_result
-            
-            run_command("silent", config, console)
-            
-            # Verify console output (should not print empty stdout)
-            expected_calls = [
-                (("[blue]Running:[/blue] exit 0",), {}),
-                (("[green]✓ Command 'silent' completed successfully[/green]",), {})
-            ]
-            assert console.print.call_count == 2
-            for i, (expected_args, expected_kwargs) in enumerate(expected_calls):
-                actual_call = console.print.call_args_list[i]
-                assert actual_call.args == expected_args
-
-    def test_run_command_not_found(self):
+        
+        run_command("silent", config, console)
+        
+        # Verify console output (should not print empty stdout)
+        expected_calls = [
+            call("[blue]Running:[/blue] exit 0"),
+            call("[green]✓ Command 'silent' completed successfully[/green]")
+        ]
+        console.print.assert_has_calls(expected_calls)
+        assert console.print.call_count == len(expected_calls)
+
+    @pytest.mark.parametrize(
+        "command",
+        ["echo hi | tr a-z A-Z", "make build && make test", "ls *.py", "cd ~"],
+        ids=["pipe", "and_list", "glob", "tilde"],
+    )
+    def test_run_command_shell_syntax_uses_shell(self, mock_popen, console, command):
+        """Test commands using shell syntax still run through the shell."""
+        run_command("test", {"commands": {"test": command}}, console)
+        
+        mock_popen.assert_called_once_with(command, shell=True, **_PIPES)
+
+    @pytest.mark.parametrize(
+        "error", [FileNotFoundError(), PermissionError()], ids=["missing", "no_exec"]
+    )
+    def test_run_command_builtin_falls_back_to_shell(self, mock_popen, console, error):
+        """Test a command that can't be executed directly is retried in a shell."""
+        mock_popen.side_effect = [error, _fake_process()]
+        
+        run_command("test", {"commands": {"test": "FOO=1 make"}}, console)
+        
+        assert mock_popen.call_args_list == [
+            call(["FOO=1", "make"], **_PIPES),
+            call("FOO=1 make", shell=True, **_PIPES),
+        ]
+
+    @pytest.mark.real_subprocess
+    @pytest.mark.skipif(os.name == "nt", reason="POSIX execute permission")
+    def test_run_command_non_executable_script_uses_shell(
+        self, tmp_path, monkeypatch, console
+    ):
+        """Test a script without the execute bit fails the way the shell reports."""
+        (tmp_path / "script.sh").write_text("#!/bin/sh\necho hi\n")
+        monkeypatch.chdir(tmp_path)
+        
+        with pytest.raises(SystemExit) as excinfo:
+            run_command("test", {"commands": {"test": "./script.sh"}}, console)
+        
+        # 126 is the shell's exit code for a file it found but couldn't run,
+        # and the shell's own explanation is shown as the command's stderr
+        assert excinfo.value.code == 126
+        console.print.assert_any_call("[red]stderr:[/red]")
+
+    def test_run_command_not_found(self, console):
         """Test error when command is not found in config."""
         config = {
             "commands": {
@@ -87,117 +140,84 @@ class TestRunCommand:
                 "build": "make build"
             }
         }
-        console = MagicMock(spec=Console)
         
-        with pytest.raises(ValueError, match="Command 'missing' not found. Available commands: test, build"):
+        with pytest.raises(ValueError, match=_ERR_MISSING):
             run_command("missing", config, console)
 
-    def test_run_command_no_commands_section(self):
+    def test_run_command_no_commands_section(self, console):
         """Test error when config has no commands section."""
         config = {}
-        console = MagicMock(spec=Console)
         
-        with pytest.raises(ValueError, match="Command 'test' not found. Available commands:"):
+        with pytest.raises(ValueError, match=_ERR_NO_COMMANDS):
             run_command("test", config, console)
 
-    def test_run_command_empty_commands_section(self):
+    def test_run_command_empty_commands_section(self, console):
         """Test error when commands section is empty."""
         config = {"commands": {}}
-        console = MagicMock(spec=Console)
         
-        with pytest.raises(ValueError, match="Command 'test' not found. Available commands:"):
+        with pytest.raises(ValueError, match=_ERR_NO_COMMANDS):
             run_command("test", config, console)
 
-    @patch("sys.exit")
-    def test_run_command_failure_with_stdout_stderr(self, mock_exit):
-        """Test command failure with both stdout and stderr."""
-        config = {
-            "commands": {
-                "fail": "ls /nonexistent"
-            }
-        }
-        console = MagicMock(spec=Console)
-        
-        with patch("subprocess.run") as mock_run:
-            error = subprocess.CalledProcessError(2, "ls /nonexistent")
-            error.stdout = "some output\n"
-            error.stderr = "ls: /nonexistent: No such file or directory\n"
-            mock_run.side_effect = error
-            
-            run_command("fail", config, console)
-            
-            # Verify console output for failure
-            expected_calls = [
-                (("[blue]Running:[/blue] ls /nonexistent",), {}),
-                (("[red]✗ Command 'fail' failed with exit code 2[/red]",), {}),
-                (("[yellow]stdout:[/yellow]",), {}),
-                (("some output\n",), {}),
-                (("[red]stderr:[/red]",), {}),
-                (("ls: /nonexistent: No such file or directory\n",), {})
-            ]
-            assert console.print.call_count == 6
-            for i, (expected_args, expected_kwargs) in enumerate(expected_calls):
-                actual_call = console.print.call_args_list[i]
-                assert actual_call.args == expected_args
-            
-            # Verify sys.exit was called with correct code
-            mock_exit.assert_called_once_with(2)
-
-    @patch("sys.exit")
-    def test_run_command_failure_no_output(self, mock_exit):
-        """Test command failure with no stdout or stderr."""
-        config = {
-            "commands": {
-                "fail": "exit 1"
-            }
-        }
-        console = MagicMock(spec=Console)
-        
-        with patch("subprocess.run") as mock_run:
-            error = subprocess.CalledProcessError(1, "exit 1")
-            error.stdout = ""
-            error.stderr = ""
-            mock_run.side_effect = error
-            
-            run_command("fail", config, console)
-            
-            # Verify console output for failure (should only show failure message)
-            expected_calls = [
-                (("[blue]Running:[/blue] exit 1",), {}),
-                (("[red]✗ Command 'fail' failed with exit code 1[/red]",), {})
-            ]
-            assert console.print.call_count == 2
-            for i, (expected_args, expected_kwargs) in enumerate(expected_calls):
-                actual_call = console.print.call_args_list[i]
-                assert actual_call.args == expected_args
-            
-            mock_exit.assert_called_once_with(1)
-
-    @patch("sys.exit")
-    def test_run_command_failure_only_stderr(self, mock_exit):
-        """Test command failure with only stderr output."""
-        config = {
-            "commands": {
-                "fail": "echo 'error' >&2 && exit 1"
-            }
-        }
-        console = MagicMock(spec=Console)
-        
-        with patch("subprocess.run") as mock_run:
-            error = subprocess.CalledProcessError(1, "echo 'error' >&2 && exit 1")
-            error.stdout = ""
-            error.stderr = "error\n"
-            mock_run.side_effect = error
-            
+    @pytest.mark.parametrize(
+        "command,returncode,stdout,stderr,expected_calls",
+        [
+            (
+                "ls /nonexistent",
+                2,
+                "some output\n",
+                "ls: /nonexistent: No such file or directory\n",
+                [
+                    call("[blue]Running:[/blue] ls /nonexistent"),
+                    call("some output\n", end=""),
+                    call("[red]✗ Command 'fail' failed with exit code 2[/red]"),
+                    call("[red]stderr:[/red]"),
+                    call("ls: /nonexistent: No such file or directory\n"),
+                ],
+            ),
+            (
+                "exit 1",
+                1,
+                "",
+                "",
+                [
+                    call("[blue]Running:[/blue] exit 1"),
+                    call("[red]✗ Command 'fail' failed with exit code 1[/red]"),
+                ],
+            ),
+            (
+                "echo 'error' >&2 && exit 1",
+                1,
+                "",
+                "error\n",
+                [
+                    call("[blue]Running:[/blue] echo 'error' >&2 && exit 1"),
+                    call("[red]✗ Command 'fail' failed with exit code 1[/red]"),
+                    call("[red]stderr:[/red]"),
+                    call("error\n"),
+                ],
+            ),
+        ],
+        ids=["stdout_and_stderr", "no_output", "only_stderr"],
+    )
+    def test_run_command_failure(
+        self,
+        mock_popen,
+        console,
+        command,
+        returncode,
+        stdout,
+        stderr,
+        expected_calls,
+    ):
+        """Test command failure output for different stdout/stderr combinations."""
+        config = {"commands": {"fail": command}}
+        
+        mock_popen.return_value = _fake_process(stdout, stderr, returncode)
+        
+        with pytest.raises(SystemExit) as excinfo:
             run_command("fail", config, console)
-            
-            # Verify console output shows only stderr
-            expected_calls = [
-                (("[blue]Running:[/blue] echo 'error' >&2 && exit 1",), {}),
-                (("[red]✗ Command 'fail' failed with exit code 1[/red]",), {}),
-                (("[red]stderr:[/red]",), {}),
-                (("error\n",), {})
-            ]
-            assert console.print.call_count == 4
-            
-            mock_exit.assert_called_once_with(1)
+        
+        # stdout was already streamed; stderr is shown once the command fails
+        console.print.assert_has_calls(expected_calls)
+        assert console.print.call_count == len(expected_calls)
+        assert excinfo.value.code == returncode
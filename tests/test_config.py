@@ -1,15 +1,17 @@
 # pyright: basic
 """Tests for configuration module."""
 
-import tempfile
 from pathlib import Path
+from unittest.mock import Mock
 
 import pytest
+import yaml
 
-from wr_cli.config import load_config
+from wr_cli import cache
+from wr_cli.config import _parse_config, _SafeLoader, load_config, load_config_cached
 
 
-def test_load_config_with_valid_file():
+def test_load_config_with_valid_file(tmp_path):
     """Test loading a valid config file."""
     config_content = """
 project_name: "test-project"
@@ -17,18 +19,13 @@ commands:
   test: "echo test"
   build: "echo build"
 """
+    config_path = tmp_path / "wr.yml"
+    config_path.write_text(config_content)
     
-    with tempfile.NamedTemporaryFile(mode='w', suffix='.yml', delete=False) as f:
-        f.write(config_content)
-        config_path = Path(f.name)
-    
-    try:
-        config = load_config(config_path)
-        assert config["project_name"] == "test-project"
-        assert config["commands"]["test"] == "echo test"
-        assert config["commands"]["build"] == "echo build"
-    finally:
-        config_path.unlink()
+    config = load_config(config_path)
+    assert config["project_name"] == "test-project"
+    assert config["commands"]["test"] == "echo test"
+    assert config["commands"]["build"] == "echo build"
 
 
 def test_load_config_with_nonexistent_file():
@@ -37,33 +34,125 @@ def test_load_config_with_nonexistent_file():
         load_config(Path("nonexistent.yml"))
 
 
-def test_load_config_with_invalid_yaml():
+def test_load_config_with_invalid_yaml(tmp_path):
     """Test loading an invalid YAML file."""
-    with tempfile.NamedTemporaryFile(mode='w', suffix='.yml', delete=False) as f:
-        f.write("invalid: yaml: content: [")
-        config_path = Path(f.name)
+    config_path = tmp_path / "wr.yml"
+    config_path.write_text("invalid: yaml: content: [")
     
-    try:
-        with pytest.raises(Exception):  # YAML parsing error
-            load_config(config_path)
-    finally:
-        config_path.unlink()
+    with pytest.raises(Exception):  # YAML parsing error
+        load_config(config_path)
 
 
-def test_load_config_from_file():
+def test_load_config_from_file(tmp_path):
     """Test loading config from a specific file path."""
-    # Create a temporary wr.yml file
     config_content = """
 project_name: "file-project"
 commands:
   test: "file test command"
 """
+    config_file = tmp_path / "custom.yml"
+    config_file.write_text(config_content)
     
-    with tempfile.TemporaryDirectory() as temp_dir:
-        temp_path = Path(temp_dir)
-        config_file = temp_path / "custom.yml"
-        config_file.write_text(config_content)
-        
-        config = load_config(config_file)
-        assert config["project_name"] == "file-project"
-        assert config["commands"]["test"] == "file test command"
+    config = load_config(config_file)
+    assert config["project_name"] == "file-project"
+    assert config["commands"]["test"] == "file test command"
+
+
+def test_load_config_matches_parsed_fixture(valid_config_path, parsed_config):
+    """Test the pre-parsed fixture stays in sync with the YAML it stands in for."""
+    assert load_config(Path(valid_config_path)) == parsed_config
+
+
+def test_load_config_uses_safe_loader(tmp_path, monkeypatch):
+    """Test load_config parses with the module-level _SafeLoader."""
+    config_path = tmp_path / "wr.yml"
+    config_path.write_text("project_name: loader-project\n")
+    instances = []
+
+    class SpyLoader(yaml.SafeLoader):
+        def __init__(self, stream):
+            instances.append(self)
+            super().__init__(stream)
+
+    monkeypatch.setattr("wr_cli.config._SafeLoader", SpyLoader)
+
+    load_config(config_path)
+    assert len(instances) == 1
+
+
+def test_safe_loader_prefers_libyaml():
+    """Test the module-level loader is CSafeLoader when libyaml is available."""
+    assert _SafeLoader is getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+def test_load_config_caches_on_mtime(tmp_path, monkeypatch):
+    """Test unchanged files are parsed once and edited files are re-parsed."""
+    config_path = tmp_path / "wr.yml"
+    config_path.write_text("project_name: first\n")
+    load_spy = Mock(wraps=yaml.load)
+    monkeypatch.setattr(yaml, "load", load_spy)
+
+    assert load_config(config_path)["project_name"] == "first"
+    assert load_config(config_path)["project_name"] == "first"
+    assert load_spy.call_count == 1
+
+    config_path.write_text("project_name: second-edit\n")
+    assert load_config(config_path)["project_name"] == "second-edit"
+    assert load_spy.call_count == 2
+
+
+def test_load_config_returns_independent_copies(tmp_path):
+    """Test mutating a loaded config does not leak into later loads."""
+    config_path = tmp_path / "wr.yml"
+    config_path.write_text("commands:\n  test: echo test\n")
+
+    load_config(config_path)["commands"]["test"] = "mutated"
+    assert load_config(config_path)["commands"]["test"] == "echo test"
+
+
+def test_load_config_cached_reuses_disk_cache(tmp_path, monkeypatch):
+    """Test a later invocation reads the cached parse instead of the YAML."""
+    config_path = tmp_path / "wr.yml"
+    config_path.write_text("project_name: cached\n")
+    load_spy = Mock(wraps=yaml.load)
+    monkeypatch.setattr(yaml, "load", load_spy)
+
+    assert load_config_cached(config_path)["project_name"] == "cached"
+    # A fresh process starts without the in-memory cache
+    _parse_config.cache_clear()
+    assert load_config_cached(config_path)["project_name"] == "cached"
+    assert load_spy.call_count == 1
+
+    config_path.write_text("project_name: cached-edit\n")
+    assert load_config_cached(config_path)["project_name"] == "cached-edit"
+    assert load_spy.call_count == 2
+
+
+def test_load_config_cached_keeps_non_string_keys(tmp_path):
+    """Test a config JSON can't represent loads the same on every invocation."""
+    config_path = tmp_path / "wr.yml"
+    config_path.write_text("commands:\n  1: echo one\n")
+
+    first = load_config_cached(config_path)
+    _parse_config.cache_clear()
+    second = load_config_cached(config_path)
+
+    assert first == second == {"commands": {1: "echo one"}}
+
+
+@pytest.mark.parametrize(
+    "fields",
+    [{}, {"config": "project_name: broken"}, {"config": ["project_name"]}],
+    ids=["missing", "string", "list"],
+)
+def test_load_config_cached_ignores_malformed_entry(tmp_path, fields):
+    """Test a cache entry with a matching signature but no usable config."""
+    config_path = tmp_path / "wr.yml"
+    config_path.write_text("project_name: reparsed\n")
+    load_config_cached(config_path)
+    cache_name = next((tmp_path / "cache" / "wr-cli").glob("config-*.json")).name
+    signature = cache.read_json(cache_name)["signature"]
+    cache.write_json(cache_name, {"signature": signature, **fields})
+    _parse_config.cache_clear()
+
+    assert load_config_cached(config_path) == {"project_name": "reparsed"}
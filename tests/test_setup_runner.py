@@ -1,213 +1,300 @@
 # pyright: basic
 """Tests for setup runner."""
 
+import io
 from unittest.mock import MagicMock
 
 import pytest
 from rich.console import Console
 
+from wr_cli.setup import SetupStep
 from wr_cli.setup.runner import SetupRunner
 
+DEFAULT_STEPS = ("Check Node.js", "Check Python", "Install uv", "Lock Python version")
+WR_CLI_STEPS = (
+    "Check Node.js",
+    "Check Python",
+    "Install uv",
+    "Install ghstack",
+    "Setup ghstack",
+    "Lock Python version",
+)
+OMNIBUS_STEPS = (
+    "Check Node.js",
+    "Check Python",
+    "Install uv",
+    "Lock Python version",
+    "Sync dependencies",
+    "Install local packages",
+)
 
-class TestSetupRunner:
-    """Test the SetupRunner class."""
-
-    def test_init_default_parameters(self):
-        """Test initialization with default parameters."""
-        console = MagicMock(spec=Console)
-        runner = SetupRunner(console)
-        
-        assert runner.console is console
-        assert runner.verbose is False
-        assert runner.force is False
-        assert runner.project_name == "unknown"
-
-    def test_init_custom_parameters(self):
-        """Test initialization with custom parameters."""
-        console = MagicMock(spec=Console)
-        runner = SetupRunner(console, verbose=True, force=True, project_name="test-project")
-        
-        assert runner.console is console
-        assert runner.verbose is True
-        assert runner.force is True
-        assert runner.project_name == "test-project"
-
-    def test_get_default_steps(self):
-        """Test that default project gets default steps."""
-        console = MagicMock(spec=Console)
-        runner = SetupRunner(console, project_name="unknown")
-        
-        # Should have 4 default steps
-        assert len(runner.steps) == 4
-        step_names = [step.name for step in runner.steps]
-        expected_steps = [
-            "Check Node.js",
-            "Check Python",
-            "Install uv",
-            "Lock Python version"
-        ]
-        assert step_names == expected_steps
-
-    def test_get_wr_cli_steps(self):
-        """Test that wr-cli project gets wr-cli specific steps."""
-        console = MagicMock(spec=Console)
-        runner = SetupRunner(console, project_name="wr-cli")
-        
-        # Should have 6 wr-cli steps
-        assert len(runner.steps) == 6
-        step_names = [step.name for step in runner.steps]
-        expected_steps = [
-            "Check Node.js",
-            "Check Python",
-            "Install uv",
-            "Install ghstack",
-            "Setup ghstack",
-            "Lock Python version"
-        ]
-        assert step_names == expected_steps
-
-    def test_get_omnibus_steps(self):
-        """Test that omnibus project gets omnibus specific steps."""
-        console = MagicMock(spec=Console)
-        runner = SetupRunner(console, project_name="omnibus")
-        
-        # Should have 6 omnibus steps
-        assert len(runner.steps) == 6
-        step_names = [step.name for step in runner.steps]
-        expected_steps = [
-            "Check Node.js",
-            "Check Python",
-            "Install uv",
-            "Lock Python version",
-            "Sync dependencies",  # This is the actual name
-            "Install local packages"
-        ]
-        assert step_names == expected_steps
-
-    def test_run_setup_all_steps_succeed(self):
-        """Test run_setup when all steps succeed."""
-        console = MagicMock(spec=Console)
-        runner = SetupRunner(console, project_name="unknown")
-        
-        # Mock all steps to succeed
-        for step in runner.steps:
-            step.run = MagicMock(return_value=True)
-        
-        result = runner.run_setup()
-        
-        assert result is True
-        
-        # Verify all steps were called with force=False (default)
-        for step in runner.steps:
-            step.run.assert_called_once_with(force=False)
-        
-        # Verify console output
-        console.print.assert_any_call("[blue]Running 4 setup steps...[/blue]\n")
-        console.print.assert_any_call("\n[green]All setup steps completed successfully![/green]")
-
-    def test_run_setup_with_force(self):
-        """Test run_setup passes force flag to steps."""
-        console = MagicMock(spec=Console)
-        runner = SetupRunner(console, project_name="unknown", force=True)
-        
-        # Mock all steps to succeed
-        for step in runner.steps:
-            step.run = MagicMock(return_value=True)
-        
-        result = runner.run_setup()
-        
-        assert result is True
-        
-        # Verify all steps were called with force=True
-        for step in runner.steps:
-            step.run.assert_called_once_with(force=True)
-
-    def test_run_setup_one_step_fails(self):
-        """Test run_setup when one step fails."""
-        console = MagicMock(spec=Console)
-        runner = SetupRunner(console, project_name="unknown")
-        
-        # Mock first step to fail, others succeed
-        runner.steps[0].run = MagicMock(return_value=False)
-        for step in runner.steps[1:]:
-            step.run = MagicMock(return_value=True)
-        
-        result = runner.run_setup()
-        
-        assert result is False
-        
-        # Verify all steps were still called
-        for step in runner.steps:
-            step.run.assert_called_once_with(force=False)
-        
-        # Verify failure message includes failed step name
-        console.print.assert_any_call(f"\n[red]Failed steps: {runner.steps[0].name}[/red]")
-
-    def test_run_setup_multiple_steps_fail(self):
-        """Test run_setup when multiple steps fail."""
-        console = MagicMock(spec=Console)
-        runner = SetupRunner(console, project_name="unknown")
-        
-        # Mock first and third steps to fail
-        runner.steps[0].run = MagicMock(return_value=False)
-        runner.steps[1].run = MagicMock(return_value=True)
-        runner.steps[2].run = MagicMock(return_value=False)
-        runner.steps[3].run = MagicMock(return_value=True)
-        
-        result = runner.run_setup()
-        
-        assert result is False
-        
-        # Verify failure message includes both failed step names
-        failed_names = f"{runner.steps[0].name}, {runner.steps[2].name}"
-        console.print.assert_any_call(f"\n[red]Failed steps: {failed_names}[/red]")
-
-    def test_run_setup_step_counter_display(self):
-        """Test that step counter is displayed correctly."""
-        console = MagicMock(spec=Console)
-        runner = SetupRunner(console, project_name="unknown")
-        
-        # Mock all steps to succeed
-        for step in runner.steps:
-            step.run = MagicMock(return_value=True)
-        
-        runner.run_setup()
-        
-        # Check that step counters were printed
-        expected_counters = ["[dim](1/4)[/dim]", "[dim](2/4)[/dim]", "[dim](3/4)[/dim]", "[dim](4/4)[/dim]"]
-        for counter in expected_counters:
-            console.print.assert_any_call(counter, end=" ")
-
-    def test_verbose_flag_passed_to_steps(self):
-        """Test that verbose flag is passed to all steps."""
-        console = MagicMock(spec=Console)
-        runner = SetupRunner(console, verbose=True, project_name="unknown")
-        
-        # Verify all steps have verbose=True
-        for step in runner.steps:
-            assert step.verbose is True
-
-    def test_console_passed_to_steps(self):
-        """Test that console is passed to all steps."""
-        console = MagicMock(spec=Console)
-        runner = SetupRunner(console, project_name="unknown")
-        
-        # Verify all steps have the same console
-        for step in runner.steps:
-            assert step.console is console
-
-    def test_project_name_unknown_uses_default_steps(self):
-        """Test that unknown project name uses default steps."""
-        console = MagicMock(spec=Console)
-        runner = SetupRunner(console, project_name="some-random-project")
-        
-        # Should fall back to default steps
-        assert len(runner.steps) == 4
-        step_names = [step.name for step in runner.steps]
-        expected_steps = [
-            "Check Node.js",
-            "Check Python",
-            "Install uv",
-            "Lock Python version"
-        ]
-        assert step_names == expected_steps
+EXPECTED_COUNTERS = frozenset(f"[dim]({i}/4)[/dim]" for i in range(1, 5))
+
+
+@pytest.fixture
+def recorded_runs(monkeypatch):
+    """Make every SetupStep.run succeed, recording (step name, force) per call."""
+    runs = []
+    monkeypatch.setattr(
+        SetupStep,
+        "run",
+        lambda self, force=False: runs.append((self.name, force)) or True,
+    )
+    return runs
+
+
+@pytest.fixture(scope="module")
+def unknown_runner(_console_template):
+    """Verbose runner for an unknown project, shared by read-only tests."""
+    return SetupRunner(_console_template, verbose=True, project_name="unknown")
+
+
+def test_init_default_parameters(console):
+    """Test initialization with default parameters."""
+    runner = SetupRunner(console)
+    
+    assert runner.console is console
+    assert runner.verbose is False
+    assert runner.force is False
+    assert runner.project_name == "unknown"
+    assert runner.keep_going is False
+
+
+def test_init_custom_parameters(console):
+    """Test initialization with custom parameters."""
+    runner = SetupRunner(
+        console, verbose=True, force=True, project_name="test-project", keep_going=True
+    )
+    
+    assert runner.console is console
+    assert runner.verbose is True
+    assert runner.force is True
+    assert runner.project_name == "test-project"
+    assert runner.keep_going is True
+
+
+@pytest.mark.parametrize(
+    "project_name,expected",
+    [
+        ("unknown", DEFAULT_STEPS),
+        ("some-random-project", DEFAULT_STEPS),
+        ("wr-cli", WR_CLI_STEPS),
+        ("omnibus", OMNIBUS_STEPS),
+    ],
+)
+def test_project_steps(console, project_name, expected):
+    """Test each project gets its own steps and unknown ones get the defaults."""
+    runner = SetupRunner(console, project_name=project_name)
+    assert tuple(step.name for step in runner.steps) == expected
+
+
+def test_run_setup_all_steps_succeed(console, recorded_runs):
+    """Test run_setup when all steps succeed."""
+    runner = SetupRunner(console, project_name="unknown")
+    
+    result = runner.run_setup()
+    
+    assert result is True
+    
+    # Verify all steps were called with force=False (default)
+    assert sorted(recorded_runs) == sorted((step.name, False) for step in runner.steps)
+    
+    # Verify console output
+    console.print.assert_any_call("[blue]Running 4 setup steps...[/blue]\n")
+    console.print.assert_any_call("\n[green]All setup steps completed successfully![/green]")
+
+
+def test_run_setup_with_force(console, recorded_runs):
+    """Test run_setup passes force flag to steps."""
+    runner = SetupRunner(console, project_name="unknown", force=True)
+    
+    result = runner.run_setup()
+    
+    assert result is True
+    
+    # Verify all steps were called with force=True
+    assert sorted(recorded_runs) == sorted((step.name, True) for step in runner.steps)
+
+
+def test_run_setup_force_clears_version_cache(console, recorded_runs, monkeypatch):
+    """Test --force re-probes tool versions instead of using the disk cache."""
+    mock_clear = MagicMock()
+    monkeypatch.setattr("wr_cli.setup.runner.clear_version_cache", mock_clear)
+    
+    SetupRunner(console, project_name="unknown").run_setup()
+    mock_clear.assert_not_called()
+    
+    SetupRunner(console, project_name="unknown", force=True).run_setup()
+    mock_clear.assert_called_once_with()
+
+
+def test_run_setup_prewarms_required_commands(console, recorded_runs, monkeypatch):
+    """Test the commands every step needs are resolved together before running."""
+    mock_prewarm = MagicMock()
+    monkeypatch.setattr("wr_cli.setup.runner.prewarm_commands", mock_prewarm)
+    
+    SetupRunner(console, project_name="wr-cli").run_setup()
+    
+    mock_prewarm.assert_called_once_with({"node", "uv", "ghstack"})
+
+
+def test_run_setup_one_step_fails(console):
+    """Test run_setup when one step fails."""
+    runner = SetupRunner(console, project_name="unknown")
+    
+    # Mock first step to fail, others succeed
+    runner.steps[0].run = MagicMock(return_value=False)
+    for step in runner.steps[1:]:
+        step.run = MagicMock(return_value=True)
+    
+    result = runner.run_setup()
+    
+    assert result is False
+    
+    # Verify all steps were still called
+    for step in runner.steps:
+        step.run.assert_called_once_with(force=False)
+    
+    # Verify failure message includes failed step name
+    console.print.assert_any_call(f"\n[red]Failed steps: {runner.steps[0].name}[/red]")
+
+
+def test_run_setup_multiple_steps_fail(console):
+    """Test run_setup when multiple steps fail."""
+    runner = SetupRunner(console, project_name="unknown")
+    
+    # Mock first and third steps to fail
+    runner.steps[0].run = MagicMock(return_value=False)
+    runner.steps[1].run = MagicMock(return_value=True)
+    runner.steps[2].run = MagicMock(return_value=False)
+    runner.steps[3].run = MagicMock(return_value=True)
+    
+    result = runner.run_setup()
+    
+    assert result is False
+    
+    # Verify failure message includes both failed step names
+    failed_names = f"{runner.steps[0].name}, {runner.steps[2].name}"
+    console.print.assert_any_call(f"\n[red]Failed steps: {failed_names}[/red]")
+
+
+@pytest.mark.parametrize("project_name", ["unknown", "wr-cli", "omnibus"])
+def test_depends_on_names_earlier_steps(console, project_name):
+    """Test every dependency names a step that runs before the dependent one."""
+    seen = set()
+    for step in SetupRunner(console, project_name=project_name).steps:
+        assert set(step.depends_on) <= seen
+        seen.add(step.name)
+
+
+def test_run_setup_skips_steps_after_failed_dependency(console):
+    """Test steps needing a failed step are skipped, transitively."""
+    runner = SetupRunner(console, project_name="wr-cli")
+    for step in runner.steps:
+        step.run = MagicMock(return_value=step.name != "Install uv")
+    
+    assert runner.run_setup() is False
+    
+    ran = [step.name for step in runner.steps if step.run.called]
+    assert ran == ["Check Node.js", "Check Python", "Install uv"]
+    console.print.assert_any_call(
+        "[yellow]⊘ Install ghstack[/yellow] skipped (needs Install uv)"
+    )
+    console.print.assert_any_call(
+        "[yellow]⊘ Setup ghstack[/yellow] skipped (needs Install ghstack)"
+    )
+    console.print.assert_any_call("\n[red]Failed steps: Install uv[/red]")
+    console.print.assert_any_call(
+        "[yellow]Skipped steps: Install ghstack, Setup ghstack, "
+        "Lock Python version[/yellow]"
+    )
+
+
+def test_run_setup_keep_going_runs_every_step(console):
+    """Test --keep-going runs dependent steps even after a failure."""
+    runner = SetupRunner(console, project_name="wr-cli", keep_going=True)
+    for step in runner.steps:
+        step.run = MagicMock(return_value=step.name != "Install uv")
+    
+    assert runner.run_setup() is False
+    
+    for step in runner.steps:
+        step.run.assert_called_once_with(force=False)
+
+
+def test_run_setup_step_counter_display(console, recorded_runs):
+    """Test that step counter is displayed correctly."""
+    runner = SetupRunner(console, project_name="unknown")
+    
+    runner.run_setup()
+    
+    # Check that step counters were printed
+    counters = {
+        c.args[0]
+        for c in console.print.call_args_list
+        if c.kwargs == {"end": " "}
+    }
+    assert counters >= EXPECTED_COUNTERS
+
+
+def test_verbose_flag_passed_to_steps(unknown_runner):
+    """Test that verbose flag is passed to all steps."""
+    # Verify all steps have verbose=True
+    for step in unknown_runner.steps:
+        assert step.verbose is True
+
+
+def test_console_passed_to_steps(unknown_runner):
+    """Test that console is passed to all steps."""
+    # Verify all steps have the same console
+    for step in unknown_runner.steps:
+        assert step.console is unknown_runner.console
+
+
+def test_group_steps_batches_consecutive_parallel_safe_steps(unknown_runner):
+    """Test the read-only checks are grouped and the installs run on their own."""
+    groups = [[i for i, _ in group] for group in unknown_runner._group_steps()]
+    assert groups == [[1, 2], [3], [4]]
+
+
+@pytest.mark.parametrize(
+    "index,captured", [(0, True), (2, False)], ids=["check", "install"]
+)
+def test_run_setup_buffers_lone_parallel_safe_step(
+    console, recorded_runs, index, captured
+):
+    """Test a read-only step's output is buffered even when it runs alone."""
+    runner = SetupRunner(console, project_name="unknown")
+    runner.steps = runner.steps[index : index + 1]
+    
+    assert runner.run_setup() is True
+    assert console.begin_capture.called is captured
+
+
+def test_group_steps_keeps_dependent_checks_apart(console):
+    """Test a parallel-safe step waits for a check it depends on."""
+    runner = SetupRunner(console, project_name="unknown")
+    node, python = runner.steps[:2]
+    python.depends_on = (node.name,)
+    
+    groups = [[i for i, _ in group] for group in runner._group_steps()]
+    assert groups == [[1], [2], [3], [4]]
+
+
+def test_run_setup_prints_parallel_output_in_step_order(monkeypatch):
+    """Test output from steps run concurrently is printed in step order."""
+    output = io.StringIO()
+    runner = SetupRunner(Console(file=output, width=80), project_name="unknown")
+    monkeypatch.setattr(
+        SetupStep,
+        "run",
+        lambda self, force=False: self.console.print(f"ran {self.name}") or True,
+    )
+    
+    assert runner.run_setup() is True
+    assert output.getvalue().splitlines()[2:6] == [
+        "(1/4) ran Check Node.js",
+        "(2/4) ran Check Python",
+        "(3/4) ran Install uv",
+        "(4/4) ran Lock Python version",
+    ]
@@ -1,7 +1,11 @@
 # pyright: basic
 """Tests for setup steps."""
 
-from unittest.mock import MagicMock, patch
+import os
+import pathlib
+import platform
+import sys
+from unittest.mock import Mock, call
 
 import pytest
 
@@ -17,358 +21,523 @@ from wr_cli.setup.steps import (
 )
 
 
-class TestCheckNodeJSStep:
-    """Test the CheckNodeJSStep class."""
-
-    def test_name_and_description(self):
-        """Test step name and description."""
-        console = MagicMock()
-        step = CheckNodeJSStep(console, verbose=False)
-        assert step.name == "Check Node.js"
-        assert step.description == "Verify Node.js is installed"
-
-    @patch("wr_cli.setup.steps.command_exists")
-    def test_is_completed_when_node_exists(self, mock_command_exists):
-        """Test is_completed returns True when Node.js exists."""
-        mock_command_exists.return_value = True
-        
-        console = MagicMock()
-        step = CheckNodeJSStep(console, verbose=False)
-        assert step.is_completed() is True
-        mock_command_exists.assert_called_once_with("node")
-
-    @patch("wr_cli.setup.steps.command_exists")
-    def test_is_completed_when_node_missing(self, mock_command_exists):
-        """Test is_completed returns False when Node.js is missing."""
-        mock_command_exists.return_value = False
-        
-        console = MagicMock()
-        step = CheckNodeJSStep(console, verbose=False)
-        assert step.is_completed() is False
-
-    @patch("wr_cli.setup.steps.get_node_version")
-    @patch("wr_cli.setup.steps.command_exists")
-    def test_execute_when_already_installed(self, mock_command_exists, mock_get_version):
-        """Test execute returns True when Node.js is already installed."""
-        mock_command_exists.return_value = True
-        mock_get_version.return_value = "v18.0.0"
-        
-        console = MagicMock()
-        step = CheckNodeJSStep(console, verbose=True)
-        assert step.execute() is True
-        console.print.assert_called_once_with("  Found Node.js v18.0.0")
-
-    @patch("wr_cli.setup.steps.command_exists")
-    @patch("wr_cli.setup.steps.platform.system")
-    def test_execute_when_missing_on_macos(self, mock_system, mock_command_exists):
-        """Test execute shows macOS install instruction when Node.js is missing."""
-        mock_command_exists.return_value = False
-        mock_system.return_value = "Darwin"
-        
-        console = MagicMock()
-        step = CheckNodeJSStep(console, verbose=False)
-        assert step.execute() is False
-        console.print.assert_called_once_with(
-            "[yellow]Node.js not found. Install with: brew install node[/yellow]"
-        )
-
-
-class TestCheckPythonStep:
-    """Test the CheckPythonStep class."""
-
-    def test_name_and_description(self):
-        """Test step name and description."""
-        console = MagicMock()
-        step = CheckPythonStep(console, verbose=False)
-        assert step.name == "Check Python"
-        assert step.description == "Verify Python 3.11+ is installed"
-
-    @patch("wr_cli.setup.steps.get_python_executable")
-    def test_is_completed_when_python_exists(self, mock_get_python):
-        """Test is_completed returns True when Python 3.11+ exists."""
-        mock_get_python.return_value = "python3.11"
-        
-        console = MagicMock()
-        step = CheckPythonStep(console, verbose=False)
-        assert step.is_completed() is True
-
-    @patch("wr_cli.setup.steps.get_python_executable")
-    def test_is_completed_when_python_missing(self, mock_get_python):
-        """Test is_completed returns False when Python 3.11+ is missing."""
-        mock_get_python.return_value = None
-        
-        console = MagicMock()
-        step = CheckPythonStep(console, verbose=False)
-        assert step.is_completed() is False
-
-
-class TestInstallUvStep:
-    """Test the InstallUvStep class."""
-
-    def test_name_and_description(self):
-        """Test step name and description."""
-        console = MagicMock()
-        step = InstallUvStep(console, verbose=False)
-        assert step.name == "Install uv"
-        assert step.description == "Install uv package manager"
-
-    @patch("wr_cli.setup.steps.command_exists")
-    def test_is_completed_when_uv_exists(self, mock_command_exists):
-        """Test is_completed returns True when uv exists."""
-        mock_command_exists.return_value = True
-        
-        console = MagicMock()
-        step = InstallUvStep(console, verbose=False)
-        assert step.is_completed() is True
-        mock_command_exists.assert_called_once_with("uv")
-
-
-class TestLockPythonVersionStep:
-    """Test the LockPythonVersionStep class."""
-
-    def test_name_and_description(self):
-        """Test step name and description."""
-        console = MagicMock()
-        step = LockPythonVersionStep(console, verbose=False)
-        assert step.name == "Lock Python version"
-        assert step.description == "Install and pin Python version from .python-version file"
-
-    def test_get_target_python_version_from_file(self):
-        """Test reading target Python version from .python-version file."""
-        console = MagicMock()
-        step = LockPythonVersionStep(console, verbose=False)
-        
-        with patch("pathlib.Path.exists", return_value=True):
-            with patch("pathlib.Path.read_text", return_value="3.11.13"):
-                version = step._get_target_python_version()
-                assert version == "3.11.13"
-
-    def test_get_target_python_version_default(self):
-        """Test default Python version when .python-version file doesn't exist."""
-        console = MagicMock()
-        step = LockPythonVersionStep(console, verbose=False)
-        
-        with patch("pathlib.Path.exists", return_value=False):
-            version = step._get_target_python_version()
-            assert version == "3.11"
-
-
-class TestInstallGhstackStep:
-    """Test the InstallGhstackStep class."""
-
-    def test_name_and_description(self):
-        """Test step name and description."""
-        console = MagicMock()
-        step = InstallGhstackStep(console, verbose=False)
-        assert step.name == "Install ghstack"
-        assert step.description == "Install ghstack for GitHub workflow"
-
-    @patch("wr_cli.setup.steps.command_exists")
-    def test_is_completed_when_ghstack_exists(self, mock_command_exists):
-        """Test is_completed returns True when ghstack exists."""
-        mock_command_exists.return_value = True
-        
-        console = MagicMock()
-        step = InstallGhstackStep(console, verbose=False)
-        assert step.is_completed() is True
-        mock_command_exists.assert_called_once_with("ghstack")
-
-    @patch("wr_cli.setup.steps.command_exists")
-    def test_is_completed_when_ghstack_missing(self, mock_command_exists):
-        """Test is_completed returns False when ghstack is missing."""
-        mock_command_exists.return_value = False
-        
-        console = MagicMock()
-        step = InstallGhstackStep(console, verbose=False)
-        assert step.is_completed() is False
-
-    @patch("wr_cli.setup.steps.run_command_interactive")
-    @patch("wr_cli.setup.steps.command_exists")
-    def test_execute_success(self, mock_command_exists, mock_run_command):
-        """Test successful ghstack installation."""
-        mock_command_exists.side_effect = [False, True]  # ghstack missing, uv exists
-        mock_run_command.return_value = (True, "success", "")
-        
-        console = MagicMock()
-        step = InstallGhstackStep(console, verbose=False)
-        result = step.execute()
-        
-        assert result is True
-        mock_run_command.assert_called_once_with(["uv", "tool", "install", "ghstack"])
-
-    @patch("wr_cli.setup.steps.command_exists")
-    def test_execute_already_completed(self, mock_command_exists):
-        """Test execute returns True when ghstack already installed."""
-        mock_command_exists.return_value = True
-        
-        console = MagicMock()
-        step = InstallGhstackStep(console, verbose=False)
-        result = step.execute()
-        
-        assert result is True
-
-    @patch("wr_cli.setup.steps.command_exists")
-    def test_execute_uv_not_available(self, mock_command_exists):
-        """Test execute fails when uv is not available."""
-        mock_command_exists.side_effect = [False, False]  # ghstack missing, uv missing
-        
-        console = MagicMock()
-        step = InstallGhstackStep(console, verbose=False)
-        result = step.execute()
-        
-        assert result is False
-        console.print.assert_called_once_with("[red]uv not installed, cannot install ghstack[/red]")
-
-    @patch("wr_cli.setup.steps.run_command_interactive")
-    @patch("wr_cli.setup.steps.command_exists")
-    def test_execute_installation_fails(self, mock_command_exists, mock_run_command):
-        """Test execute fails when installation fails."""
-        mock_command_exists.side_effect = [False, True]  # ghstack missing, uv exists
-        mock_run_command.return_value = (False, "", "installation failed")
-        
-        console = MagicMock()
-        step = InstallGhstackStep(console, verbose=False)
-        result = step.execute()
-        
-        assert result is False
-        console.print.assert_called_once_with("[red]Failed to install ghstack: installation failed[/red]")
-
-
-class TestSetupGhstackStep:
-    """Test the SetupGhstackStep class."""
-
-    def test_name_and_description(self):
-        """Test step name and description."""
-        console = MagicMock()
-        step = SetupGhstackStep(console, verbose=False)
-        assert step.name == "Setup ghstack"
-        assert step.description == "Configure ghstack with GitHub authentication"
-
-    def test_is_completed_when_config_exists(self):
-        """Test is_completed returns True when .ghstackrc exists."""
-        console = MagicMock()
-        step = SetupGhstackStep(console, verbose=False)
-        
-        with patch("pathlib.Path.exists", return_value=True):
-            assert step.is_completed() is True
-
-    def test_is_completed_when_config_missing(self):
-        """Test is_completed returns False when .ghstackrc is missing."""
-        console = MagicMock()
-        step = SetupGhstackStep(console, verbose=False)
-        
-        with patch("pathlib.Path.exists", return_value=False):
-            assert step.is_completed() is False
-
-    @patch("wr_cli.setup.steps.run_command_interactive")
-    @patch("wr_cli.setup.steps.command_exists")
-    def test_execute_success(self, mock_command_exists, mock_run_command):
-        """Test successful ghstack setup."""
-        mock_command_exists.return_value = True
-        mock_run_command.return_value = (True, "setup complete", "")
-        
-        console = MagicMock()
-        step = SetupGhstackStep(console, verbose=False)
-        result = step.execute()
-        
-        assert result is True
-        mock_run_command.assert_called_once_with(["ghstack"])
-
-    @patch("wr_cli.setup.steps.command_exists")
-    def test_execute_ghstack_not_installed(self, mock_command_exists):
-        """Test execute fails when ghstack is not installed."""
-        mock_command_exists.return_value = False
-        
-        console = MagicMock()
-        step = SetupGhstackStep(console, verbose=False)
-        result = step.execute()
-        
-        assert result is False
-        console.print.assert_called_once_with("[red]ghstack not installed[/red]")
-
-
-class TestInstallRequirementsStep:
-    """Test the InstallRequirementsStep class."""
-
-    def test_name_and_description(self):
-        """Test step name and description."""
-        console = MagicMock()
-        step = InstallRequirementsStep(console, verbose=False)
-        assert step.name == "Sync dependencies"
-        assert step.description == "Install and sync project dependencies"
-
-    def test_is_completed_always_false(self):
-        """Test is_completed returns True (caching behavior)."""
-        console = MagicMock()
-        step = InstallRequirementsStep(console, verbose=False)
-        assert step.is_completed() is True  # It actually returns True for caching
-
-    @patch("wr_cli.setup.steps.run_command_interactive")
-    def test_execute_success(self, mock_run_command):
-        """Test successful requirements installation."""
-        mock_run_command.return_value = (True, "installed", "")
-        
-        console = MagicMock()
-        step = InstallRequirementsStep(console, verbose=False)
-        result = step.execute()
-        
-        assert result is True
-        mock_run_command.assert_called_once_with(["uv", "sync"], show_command=False)
-
-    @patch("wr_cli.setup.steps.run_command_interactive")
-    def test_execute_failure(self, mock_run_command):
-        """Test failed requirements installation."""
-        mock_run_command.return_value = (False, "", "sync failed")
-        
-        console = MagicMock()
-        step = InstallRequirementsStep(console, verbose=False)
-        result = step.execute()
-        
-        assert result is False
-        console.print.assert_called_once_with("[red]Failed to sync dependencies: sync failed[/red]")
-
-
-class TestInstallLocalPackagesStep:
-    """Test the InstallLocalPackagesStep class."""
-
-    def test_name_and_description(self):
-        """Test step name and description."""
-        console = MagicMock()
-        step = InstallLocalPackagesStep(console, verbose=False)
-        assert step.name == "Install local packages"
-        assert step.description == "Install omnibus, parsley from local directories"
-
-    def test_is_completed_always_false(self):
-        """Test is_completed always returns False (always run this step)."""
-        console = MagicMock()
-        step = InstallLocalPackagesStep(console, verbose=False)
-        assert step.is_completed() is False
-
-    @patch("wr_cli.setup.steps.run_command_interactive")
-    @patch("wr_cli.setup.steps.command_exists")
-    @patch("pathlib.Path.exists")
-    def test_execute_success(self, mock_path_exists, mock_command_exists, mock_run_command):
-        """Test successful local packages installation."""
-        mock_command_exists.return_value = True  # uv exists
-        mock_path_exists.side_effect = lambda: True  # package dir and pyproject.toml exist
-        mock_run_command.return_value = (True, "installed", "")
-        
-        console = MagicMock()
-        step = InstallLocalPackagesStep(console, verbose=False)
-        result = step.execute()
-        
-        assert result is True
-        # Should call uv add for each package
-        assert mock_run_command.call_count >= 1
-
-    @patch("wr_cli.setup.steps.command_exists")
-    def test_execute_failure(self, mock_command_exists):
-        """Test failed local packages installation when uv is missing."""
-        mock_command_exists.return_value = False  # uv not available
-        
-        console = MagicMock()
-        step = InstallLocalPackagesStep(console, verbose=False)
-        result = step.execute()
-        
-        assert result is False
-        console.print.assert_called_once_with("[red]uv not installed[/red]")
+@pytest.fixture
+def mock_path_exists(monkeypatch):
+    """Return a setter that makes every Path.exists() report the given value."""
+
+    def _set(value):
+        monkeypatch.setattr(pathlib.Path, "exists", lambda self: value)
+
+    return _set
+
+
+STEP_METADATA = [
+    (CheckNodeJSStep, "Check Node.js", "Verify Node.js is installed"),
+    (CheckPythonStep, "Check Python", "Verify Python 3.11+ is installed"),
+    (InstallUvStep, "Install uv", "Install uv package manager"),
+    (
+        LockPythonVersionStep,
+        "Lock Python version",
+        "Install and pin Python version from .python-version file",
+    ),
+    (InstallGhstackStep, "Install ghstack", "Install ghstack for GitHub workflow"),
+    (
+        SetupGhstackStep,
+        "Setup ghstack",
+        "Configure ghstack with GitHub authentication",
+    ),
+    (
+        InstallRequirementsStep,
+        "Sync dependencies",
+        "Install and sync project dependencies",
+    ),
+    (
+        InstallLocalPackagesStep,
+        "Install local packages",
+        "Install omnibus, parsley from local directories",
+    ),
+]
+
+
+@pytest.mark.parametrize(
+    "step_cls,name,desc", STEP_METADATA, ids=[row[0].__name__ for row in STEP_METADATA]
+)
+def test_step_metadata(step_cls, name, desc):
+    """Test each step's name and description."""
+    step = step_cls(Mock(), verbose=False)
+    assert step.name == name
+    assert step.description == desc
+
+
+@pytest.mark.parametrize(
+    "step_cls,patch_target,return_val,expected",
+    [
+        (CheckNodeJSStep, "wr_cli.setup.steps.command_exists", True, True),
+        (CheckNodeJSStep, "wr_cli.setup.steps.command_exists", False, False),
+        (
+            CheckPythonStep,
+            "wr_cli.setup.steps.get_python_executable",
+            sys.executable,
+            True,
+        ),
+        (CheckPythonStep, "wr_cli.setup.steps.get_python_executable", None, False),
+        (InstallUvStep, "wr_cli.setup.steps.command_exists", True, True),
+        (InstallUvStep, "wr_cli.setup.steps.command_exists", False, False),
+        (InstallGhstackStep, "wr_cli.setup.steps.command_exists", True, True),
+        (InstallGhstackStep, "wr_cli.setup.steps.command_exists", False, False),
+        (SetupGhstackStep, "pathlib.Path.exists", True, True),
+        (SetupGhstackStep, "pathlib.Path.exists", False, False),
+    ],
+)
+def test_is_completed(step_cls, patch_target, return_val, expected, monkeypatch):
+    """Test is_completed follows the check each step relies on."""
+    monkeypatch.setattr(patch_target, lambda *a, **k: return_val)
+    assert step_cls(Mock(), verbose=False).is_completed() is expected
+
+
+@pytest.mark.parametrize(
+    "step_cls,command",
+    [(CheckNodeJSStep, "node"), (InstallUvStep, "uv"), (InstallGhstackStep, "ghstack")],
+)
+def test_is_completed_checks_command(step_cls, command, monkeypatch):
+    """Test is_completed looks up the command the step installs or needs."""
+    mock_command_exists = Mock(return_value=True)
+    monkeypatch.setattr("wr_cli.setup.steps.command_exists", mock_command_exists)
+    step_cls(Mock(), verbose=False).is_completed()
+    mock_command_exists.assert_called_once_with(command)
+
+
+@pytest.mark.parametrize(
+    "step_cls,stubs,expected_message",
+    [
+        (
+            InstallGhstackStep,
+            {"command_exists": lambda name: False},
+            "[red]uv not installed, cannot install ghstack[/red]",
+        ),
+        (
+            InstallGhstackStep,
+            {
+                "command_exists": lambda name: name == "uv",
+                "run_command_interactive": lambda *a, **k: (
+                    False,
+                    "",
+                    "installation failed",
+                ),
+            },
+            "[red]Failed to install ghstack: installation failed[/red]",
+        ),
+        (
+            SetupGhstackStep,
+            {"command_exists": lambda name: False},
+            "[red]ghstack not installed[/red]",
+        ),
+        (
+            InstallRequirementsStep,
+            {
+                "command_exists": lambda name: True,
+                "run_command_streaming": lambda *a, **k: (False, "error: oops", ""),
+            },
+            "[red]Failed to sync dependencies; see the uv output above[/red]",
+        ),
+        (
+            InstallRequirementsStep,
+            {
+                "command_exists": lambda name: True,
+                "run_command_streaming": lambda *a, **k: (
+                    False,
+                    "",
+                    "Command not found: uv",
+                ),
+            },
+            "[red]Failed to sync dependencies: Command not found: uv[/red]",
+        ),
+        (
+            InstallLocalPackagesStep,
+            {"command_exists": lambda name: False},
+            "[red]uv not installed[/red]",
+        ),
+    ],
+    ids=[
+        "ghstack_uv_missing",
+        "ghstack_install_fails",
+        "ghstack_setup_not_installed",
+        "requirements_sync_fails",
+        "requirements_uv_not_found",
+        "local_packages_uv_missing",
+    ],
+)
+def test_execute_error_path(step_cls, stubs, expected_message, console, monkeypatch):
+    """Test execute fails and reports why when a prerequisite or command fails."""
+    for attr, stub in stubs.items():
+        monkeypatch.setattr(f"wr_cli.setup.steps.{attr}", stub)
+    
+    assert step_cls(console, verbose=False).execute() is False
+    console.print.assert_called_once_with(expected_message)
+
+
+def test_check_nodejs_execute_when_already_installed(monkeypatch):
+    """Test execute returns True when Node.js is already installed."""
+    monkeypatch.setattr("wr_cli.setup.steps.command_exists", lambda name: True)
+    monkeypatch.setattr("wr_cli.setup.steps.get_node_version", lambda: "v18.0.0")
+    
+    console = Mock()
+    step = CheckNodeJSStep(console, verbose=True)
+    assert step.execute() is True
+    console.print.assert_called_once_with("  Found Node.js v18.0.0")
+
+
+def test_check_nodejs_execute_quiet_skips_version_probe(monkeypatch):
+    """Test the Node.js version is not probed when it won't be printed."""
+    monkeypatch.setattr("wr_cli.setup.steps.command_exists", lambda name: True)
+    mock_get_version = Mock(return_value="v18.0.0")
+    monkeypatch.setattr("wr_cli.setup.steps.get_node_version", mock_get_version)
+    
+    console = Mock()
+    step = CheckNodeJSStep(console, verbose=False)
+    assert step.execute() is True
+    mock_get_version.assert_not_called()
+    console.print.assert_not_called()
+
+
+def test_check_nodejs_execute_when_missing_on_macos(monkeypatch):
+    """Test execute shows macOS install instruction when Node.js is missing."""
+    monkeypatch.setattr("wr_cli.setup.steps.command_exists", lambda name: False)
+    monkeypatch.setattr("wr_cli.setup.steps.platform.system", lambda: "Darwin")
+    
+    console = Mock()
+    step = CheckNodeJSStep(console, verbose=False)
+    assert step.execute() is False
+    console.print.assert_called_once_with(
+        "[yellow]Node.js not found. Install with: brew install node[/yellow]"
+    )
+
+
+def test_check_python_execute_reports_version(monkeypatch):
+    """Test the verbose message names the version of the running interpreter."""
+    monkeypatch.setattr(
+        "wr_cli.setup.steps.get_python_executable", lambda: sys.executable
+    )
+
+    console = Mock()
+    step = CheckPythonStep(console, verbose=True)
+    assert step.execute() is True
+    console.print.assert_called_once_with(f"  Found Python {platform.python_version()}")
+
+
+@pytest.mark.parametrize(
+    "system,node_hint,python_hint",
+    [
+        ("Linux", "Install with: sudo apt-get", "Install with: sudo apt-get"),
+        ("Windows", "https://nodejs.org/", "https://python.org/"),
+        ("FreeBSD", "Please install Node.js", "Please install Python 3.11+"),
+    ],
+)
+def test_check_steps_install_hints(monkeypatch, system, node_hint, python_hint):
+    """Test the missing-tool messages give an install hint for each platform."""
+    monkeypatch.setattr("wr_cli.setup.steps.platform.system", lambda: system)
+    monkeypatch.setattr("wr_cli.setup.steps.command_exists", lambda name: False)
+    monkeypatch.setattr("wr_cli.setup.steps.get_python_executable", lambda: None)
+    
+    for step_cls, hint in ((CheckNodeJSStep, node_hint), (CheckPythonStep, python_hint)):
+        console = Mock()
+        assert step_cls(console, verbose=False).execute() is False
+        (message,), _ = console.print.call_args
+        assert message.startswith("[yellow]") and hint in message
+
+
+def test_lock_python_version_target_from_file(tmp_path, monkeypatch):
+    """Test reading target Python version from .python-version file."""
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / ".python-version").write_text("3.11.13\n")
+    
+    console = Mock()
+    step = LockPythonVersionStep(console, verbose=False)
+    assert step._get_target_python_version() == "3.11.13"
+
+
+def test_lock_python_version_target_default(tmp_path, monkeypatch):
+    """Test default Python version when .python-version file doesn't exist."""
+    monkeypatch.chdir(tmp_path)
+    
+    console = Mock()
+    step = LockPythonVersionStep(console, verbose=False)
+    assert step._get_target_python_version() == "3.11"
+
+
+def test_lock_python_version_current_version_is_cached(tmp_path, monkeypatch):
+    """Test uv is asked for the active version once until the step pins it."""
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / ".python-version").write_text("3.11.9\n")
+    monkeypatch.setattr("wr_cli.setup.steps.command_exists", lambda name: True)
+    mock_run = Mock(return_value=(True, "Python 3.10.4", ""))
+    monkeypatch.setattr("wr_cli.setup.steps.run_command", mock_run)
+    monkeypatch.setattr(
+        "wr_cli.setup.steps.run_command_interactive", Mock(return_value=(True, "", ""))
+    )
+    
+    step = LockPythonVersionStep(Mock(), verbose=False)
+    assert step.is_completed() is False
+    assert step.is_completed() is False
+    assert mock_run.call_count == 1
+    
+    assert step.execute() is True
+    mock_run.return_value = (True, "Python 3.11.9", "")
+    assert step.is_completed() is True
+    assert mock_run.call_count == 2
+
+
+def test_lock_python_version_execute_installs_then_pins(tmp_path, monkeypatch):
+    """Test the install and pin run as two direct uv commands."""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr("wr_cli.setup.steps.command_exists", lambda name: True)
+    mock_run_command = Mock(return_value=(True, "", ""))
+    monkeypatch.setattr("wr_cli.setup.steps.run_command_interactive", mock_run_command)
+    
+    step = LockPythonVersionStep(Mock(), verbose=False)
+    
+    assert step.execute() is True
+    assert mock_run_command.call_args_list == [
+        call(["uv", "python", "install", "3.11"], show_command=False),
+        call(["uv", "python", "pin", "3.11"], show_command=False),
+    ]
+
+
+@pytest.mark.parametrize(
+    "results,message",
+    [
+        (
+            [(False, "", "")],
+            "[red]Failed to install Python 3.11; see the uv output above[/red]",
+        ),
+        (
+            [(True, "", ""), (False, "", "")],
+            "[red]Failed to pin Python 3.11; see the uv output above[/red]",
+        ),
+    ],
+    ids=["install_fails", "pin_fails"],
+)
+def test_lock_python_version_execute_reports_failed_command(
+    tmp_path, monkeypatch, results, message
+):
+    """Test a failed install or pin says which one failed."""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr("wr_cli.setup.steps.command_exists", lambda name: True)
+    monkeypatch.setattr(
+        "wr_cli.setup.steps.run_command_interactive", Mock(side_effect=results)
+    )
+    
+    console = Mock()
+    step = LockPythonVersionStep(console, verbose=False)
+    
+    assert step.execute() is False
+    console.print.assert_called_once_with(message)
+
+
+def test_install_uv_execute_downloads_release(tmp_path, monkeypatch):
+    """Test uv is installed from its release build and put on PATH."""
+    monkeypatch.setattr("wr_cli.setup.steps.platform.system", lambda: "Linux")
+    monkeypatch.setattr(
+        "wr_cli.setup.steps.uv_release_target", lambda: "x86_64-unknown-linux-gnu"
+    )
+    mock_install = Mock()
+    monkeypatch.setattr("wr_cli.setup.steps.install_uv_release", mock_install)
+    monkeypatch.setattr("wr_cli.setup.steps.command_exists", lambda name: False)
+    mock_remember = Mock()
+    monkeypatch.setattr("wr_cli.setup.steps.remember_command", mock_remember)
+    monkeypatch.delenv("XDG_BIN_HOME", raising=False)
+    monkeypatch.setattr(pathlib.Path, "home", lambda: tmp_path)
+    monkeypatch.setenv("PATH", "/usr/bin")
+    
+    console = Mock()
+    step = InstallUvStep(console, verbose=False)
+    
+    assert step.execute() is True
+    bin_dir = tmp_path / ".local" / "bin"
+    mock_install.assert_called_once_with("x86_64-unknown-linux-gnu", bin_dir)
+    # The steps that follow use the installed uv without searching PATH
+    mock_remember.assert_called_once_with("uv", str(bin_dir / "uv"))
+    assert os.environ["PATH"] == os.pathsep.join([str(bin_dir), "/usr/bin"])
+    console.print.assert_any_call(
+        f"[yellow]Add {bin_dir} to your PATH to use uv outside wr setup[/yellow]"
+    )
+
+
+def test_install_ghstack_execute_success(monkeypatch):
+    """Test successful ghstack installation."""
+    # ghstack missing, uv exists
+    monkeypatch.setattr("wr_cli.setup.steps.command_exists", lambda name: name == "uv")
+    mock_run_command = Mock(return_value=(True, "success", ""))
+    monkeypatch.setattr("wr_cli.setup.steps.run_command_interactive", mock_run_command)
+    mock_forget = Mock()
+    monkeypatch.setattr("wr_cli.setup.steps.forget_command", mock_forget)
+    
+    console = Mock()
+    step = InstallGhstackStep(console, verbose=False)
+    result = step.execute()
+    
+    assert result is True
+    mock_run_command.assert_called_once_with(["uv", "tool", "install", "ghstack"])
+    # The new ghstack must be visible to the steps that follow
+    mock_forget.assert_called_once_with("ghstack")
+
+
+def test_install_ghstack_execute_already_completed(monkeypatch):
+    """Test execute returns True when ghstack already installed."""
+    monkeypatch.setattr("wr_cli.setup.steps.command_exists", lambda name: True)
+    
+    console = Mock()
+    step = InstallGhstackStep(console, verbose=False)
+    result = step.execute()
+    
+    assert result is True
+
+
+def test_setup_ghstack_execute_success(monkeypatch, mock_path_exists):
+    """Test successful ghstack setup."""
+    monkeypatch.setattr("wr_cli.setup.steps.command_exists", lambda name: True)
+    mock_run_command = Mock(return_value=(True, "setup complete", ""))
+    monkeypatch.setattr("wr_cli.setup.steps.run_command_interactive", mock_run_command)
+    # ghstack writes ~/.ghstackrc itself, so no token prompt follows
+    mock_path_exists(True)
+    
+    console = Mock()
+    step = SetupGhstackStep(console, verbose=False)
+    result = step.execute()
+    
+    assert result is True
+    mock_run_command.assert_called_once_with(["ghstack"])
+
+
+def test_install_requirements_is_completed_when_lock_is_fresh(tmp_path, monkeypatch):
+    """Test is_completed returns True when uv.lock is newer than pyproject.toml."""
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "pyproject.toml").write_text("")
+    (tmp_path / "uv.lock").write_text("")
+    os.utime(tmp_path / "pyproject.toml", ns=(1_000, 1_000))
+    os.utime(tmp_path / "uv.lock", ns=(2_000, 2_000))
+    
+    console = Mock()
+    step = InstallRequirementsStep(console, verbose=False)
+    assert step.is_completed() is True
+
+
+def test_install_requirements_is_completed_when_lock_is_stale(tmp_path, monkeypatch):
+    """Test is_completed returns False when pyproject.toml changed after uv.lock."""
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "pyproject.toml").write_text("")
+    (tmp_path / "uv.lock").write_text("")
+    os.utime(tmp_path / "uv.lock", ns=(1_000, 1_000))
+    os.utime(tmp_path / "pyproject.toml", ns=(2_000, 2_000))
+    
+    console = Mock()
+    step = InstallRequirementsStep(console, verbose=False)
+    assert step.is_completed() is False
+
+
+@pytest.mark.parametrize("present", ["pyproject.toml", "uv.lock"])
+def test_install_requirements_is_completed_when_file_missing(
+    tmp_path, monkeypatch, present
+):
+    """Test is_completed returns False unless both files exist."""
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / present).write_text("")
+    
+    step = InstallRequirementsStep(Mock(), verbose=False)
+    assert step.is_completed() is False
+
+
+def test_install_requirements_execute_success(monkeypatch):
+    """Test successful requirements installation."""
+    monkeypatch.setattr("wr_cli.setup.steps.command_exists", lambda name: True)
+    mock_run_command = Mock(return_value=(True, "installed", ""))
+    monkeypatch.setattr("wr_cli.setup.steps.run_command_streaming", mock_run_command)
+    
+    console = Mock()
+    step = InstallRequirementsStep(console, verbose=False)
+    result = step.execute()
+    
+    assert result is True
+    assert mock_run_command.call_args.args[0] == ["uv", "sync", "--color=always"]
+    
+    # Each line of uv's output goes to the step's console
+    on_line = mock_run_command.call_args.args[1]
+    on_line("\x1b[32mResolved\x1b[0m 3 packages")
+    assert console.print.call_args.args[0].plain == "Resolved 3 packages"
+
+
+def test_install_local_packages_is_completed_always_false():
+    """Test is_completed always returns False (always run this step)."""
+    console = Mock()
+    step = InstallLocalPackagesStep(console, verbose=False)
+    assert step.is_completed() is False
+
+
+def test_install_local_packages_execute_success(monkeypatch, mock_path_exists):
+    """Test successful local packages installation."""
+    # uv exists
+    monkeypatch.setattr("wr_cli.setup.steps.command_exists", lambda name: True)
+    # package dir and pyproject.toml exist
+    mock_path_exists(True)
+    mock_run_command = Mock(return_value=(True, "installed", ""))
+    monkeypatch.setattr("wr_cli.setup.steps.run_command_interactive", mock_run_command)
+    
+    console = Mock()
+    step = InstallLocalPackagesStep(console, verbose=False)
+    result = step.execute()
+    
+    assert result is True
+    # Both packages are added by a single uv call
+    mock_run_command.assert_called_once_with(
+        ["uv", "add", "--editable", "./omnibus", "--editable", "./parsley"],
+        show_command=False,
+    )
+
+
+@pytest.mark.parametrize(
+    "error,message",
+    [
+        ("", "[red]Failed to add omnibus, parsley; see the uv output above[/red]"),
+        (
+            "Error running command: boom",
+            "[red]Failed to add omnibus, parsley: Error running command: boom[/red]",
+        ),
+    ],
+    ids=["uv_fails", "uv_not_started"],
+)
+def test_install_local_packages_execute_failure(
+    monkeypatch, mock_path_exists, error, message
+):
+    """Test a failed uv add reports every package it was adding, once."""
+    monkeypatch.setattr("wr_cli.setup.steps.command_exists", lambda name: True)
+    mock_path_exists(True)
+    monkeypatch.setattr(
+        "wr_cli.setup.steps.run_command_interactive",
+        Mock(return_value=(False, "", error)),
+    )
+
+    console = Mock()
+    step = InstallLocalPackagesStep(console, verbose=True)
+
+    assert step.execute() is False
+    console.print.assert_called_once_with(message)
+
+
+@pytest.mark.parametrize(
+    "dirs,expected",
+    [([], True), (["omnibus"], False)],
+    ids=["no_directories", "directory_without_pyproject"],
+)
+def test_install_local_packages_nothing_to_add(tmp_path, monkeypatch, dirs, expected):
+    """Test the step succeeds with no package directories but not with bad ones."""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr("wr_cli.setup.steps.command_exists", lambda name: True)
+    mock_run_command = Mock()
+    monkeypatch.setattr("wr_cli.setup.steps.run_command_interactive", mock_run_command)
+    for name in dirs:
+        (tmp_path / name).mkdir()
+    
+    step = InstallLocalPackagesStep(Mock(), verbose=False)
+    
+    assert step.execute() is expected
+    mock_run_command.assert_not_called()
@@ -1,20 +1,38 @@
 # pyright: basic
 """Fixed tests for setup utilities based on actual implementation."""
 
+import hashlib
+import io
+import os
 import platform
+import shutil
 import subprocess
 import sys
-from pathlib import Path
+import tarfile
 from unittest.mock import MagicMock, patch
 
+import pytest
+
+from wr_cli import cache
 from wr_cli.setup.utils import (
+    _command_paths,
+    _search_path,
+    clear_command_cache,
+    clear_version_cache,
     command_exists,
+    ensure_directory,
+    forget_command,
     get_node_version,
     get_python_executable,
     get_system_info,
+    install_uv_release,
+    prewarm_commands,
+    probe_versions,
+    remember_command,
     run_command,
     run_command_interactive,
-    ensure_directory,
+    run_command_streaming,
+    uv_release_target,
 )
 
 
@@ -27,6 +45,7 @@ def test_command_exists():
     assert command_exists("nonexistent_command_12345") == False
 
 
+@pytest.mark.real_subprocess
 def test_run_command():
     """Test run_command function."""
     success, stdout, stderr = run_command(["echo", "hello"])
@@ -48,17 +67,18 @@ def test_get_system_info():
     assert "python_version" in info
 
 
+@patch("wr_cli.setup.utils._search_path", return_value=None)
 @patch("subprocess.run")
-def test_run_command_success_with_output(mock_run):
+def test_run_command_success_with_output(mock_run, mock_which):
     """Test run_command with successful execution and output."""
     mock_result = MagicMock()
     mock_result.returncode = 0
     mock_result.stdout = "test output"
     mock_result.stderr = ""
     mock_run.return_value = mock_result
-    
+
     success, stdout, stderr = run_command(["test", "command"])
-    
+
     assert success is True
     assert stdout == "test output"
     assert stderr == ""
@@ -71,6 +91,37 @@ def test_run_command_success_with_output(mock_run):
     )
 
 
+@patch("wr_cli.setup.utils._search_path", return_value="/usr/bin/test")
+@patch("subprocess.run")
+def test_run_command_resolved_executable_uses_posix_spawn(mock_run, mock_which):
+    """Test a command found on PATH runs by full path without closing fds."""
+    mock_run.return_value = MagicMock(stdout="ok", stderr="")
+
+    run_command(["test", "command"], posix_spawn=True)
+
+    mock_run.assert_called_once_with(
+        ["/usr/bin/test", "command"],
+        capture_output=True,
+        text=True,
+        check=True,
+        close_fds=False,
+    )
+
+
+@patch("wr_cli.setup.utils._search_path", return_value="/usr/bin/test")
+@patch("subprocess.run")
+def test_run_command_closes_fds_by_default(mock_run, mock_which):
+    """Test commands that don't opt in keep subprocess's default of closing fds."""
+    mock_run.return_value = MagicMock(stdout="ok", stderr="")
+
+    run_command(["test", "command"])
+
+    mock_run.assert_called_once_with(
+        ["test", "command"], capture_output=True, text=True, check=True, cwd=None
+    )
+    mock_which.assert_not_called()
+
+
 @patch("subprocess.run")
 def test_run_command_failure_with_error(mock_run):
     """Test run_command with failed execution and error output."""
@@ -79,9 +130,9 @@ def test_run_command_failure_with_error(mock_run):
     error.stdout = "partial output"
     error.stderr = "error message"
     mock_run.side_effect = error
-    
+
     success, stdout, stderr = run_command(["test", "command"])
-    
+
     assert success is False
     assert stdout == "partial output"
     assert stderr == "error message"
@@ -91,9 +142,9 @@ def test_run_command_failure_with_error(mock_run):
 def test_run_command_file_not_found(mock_run):
     """Test run_command when command file is not found."""
     mock_run.side_effect = FileNotFoundError()
-    
+
     success, stdout, stderr = run_command(["nonexistent", "command"])
-    
+
     assert success is False
     assert stdout == ""
     assert stderr == "Command not found: nonexistent"
@@ -102,24 +153,24 @@ def test_run_command_file_not_found(mock_run):
 @patch("subprocess.run")
 def test_run_command_interactive_mode(mock_run):
     """Test run_command in interactive mode."""
-    with patch("subprocess.Popen") as mock_popen:
-        mock_process = MagicMock()
-        mock_process.wait.return_value = 0
-        mock_popen.return_value = mock_process
-        
-        success, stdout, stderr = run_command(["test", "command"], interactive=True)
-        
-        assert success is True
-        assert stdout == ""  # Interactive mode doesn't capture output
-        assert stderr == ""
-        
-        mock_popen.assert_called_once_with(
-            ["test", "command"],
-            cwd=None,
-            text=True,
-            bufsize=1,
-            universal_newlines=True,
-        )
+    mock_run.return_value = MagicMock(returncode=0)
+
+    success, stdout, stderr = run_command(["test", "command"], interactive=True)
+
+    assert success is True
+    assert stdout == ""  # Interactive mode doesn't capture output
+    assert stderr == ""
+
+    # Output goes straight to the terminal, so no pipe settings are passed
+    mock_run.assert_called_once_with(["test", "command"], cwd=None, check=True)
+
+
+@patch("subprocess.run")
+def test_run_command_interactive_mode_failure(mock_run):
+    """Test a failing interactive command is reported without raising."""
+    mock_run.side_effect = subprocess.CalledProcessError(1, ["test", "command"])
+
+    assert run_command(["test", "command"], interactive=True) == (False, "", "")
 
 
 @patch("subprocess.run")
@@ -128,17 +179,28 @@ def test_run_command_interactive_success(mock_run):
     mock_result = MagicMock()
     mock_result.returncode = 0
     mock_run.return_value = mock_result
-    
+
     success, stdout, stderr = run_command_interactive(["test", "command"])
-    
+
     assert success is True
     assert stdout == ""  # run_command_interactive doesn't return output
     assert stderr == ""
+    # A list runs directly, without a shell in between
+    mock_run.assert_called_once_with(
+        ["test", "command"], shell=False, cwd=None, text=True
+    )
+
+
+@patch("subprocess.run")
+def test_run_command_interactive_string_uses_shell(mock_run):
+    """Test a command string is handed to the shell."""
+    mock_run.return_value = MagicMock(returncode=0)
+
+    success, _, _ = run_command_interactive("make && make test")
+
+    assert success is True
     mock_run.assert_called_once_with(
-        "test command",
-        shell=True,
-        cwd=None,
-        text=True
+        "make && make test", shell=True, cwd=None, text=True
     )
 
 
@@ -148,9 +210,9 @@ def test_run_command_interactive_failure(mock_run):
     mock_result = MagicMock()
     mock_result.returncode = 1
     mock_run.return_value = mock_result
-    
+
     success, stdout, stderr = run_command_interactive(["test", "command"])
-    
+
     assert success is False
     assert stdout == ""
     assert stderr == ""
@@ -160,9 +222,9 @@ def test_run_command_interactive_failure(mock_run):
 def test_run_command_interactive_exception(mock_run):
     """Test run_command_interactive when subprocess raises exception."""
     mock_run.side_effect = RuntimeError("Command failed")
-    
+
     success, stdout, stderr = run_command_interactive(["test", "command"])
-    
+
     assert success is False
     assert stdout == ""
     assert "Error running command: Command failed" in stderr
@@ -174,31 +236,56 @@ def test_run_command_interactive_no_show_command(mock_run):
     mock_result = MagicMock()
     mock_result.returncode = 0
     mock_run.return_value = mock_result
-    
+
     success, stdout, stderr = run_command_interactive(["test", "command"], show_command=False)
-    
+
     assert success is True
     # Command should still be executed even without showing it
     mock_run.assert_called_once()
 
 
+@patch("subprocess.Popen")
+def test_run_command_streaming_passes_each_line(mock_popen):
+    """Test run_command_streaming hands output to the callback line by line."""
+    process = mock_popen.return_value.__enter__.return_value
+    process.stdout = io.StringIO("Resolved 3 packages\nerror: oops\n")
+    process.wait.return_value = 1
+    lines = []
+
+    success, output, stderr = run_command_streaming(["uv", "sync"], lines.append)
+
+    assert success is False
+    assert lines == ["Resolved 3 packages", "error: oops"]
+    assert output == "Resolved 3 packages\nerror: oops"
+    assert mock_popen.call_args.kwargs["stderr"] == subprocess.STDOUT
+
+
+@patch("subprocess.Popen", side_effect=FileNotFoundError())
+def test_run_command_streaming_not_found(mock_popen):
+    """Test run_command_streaming when the command is not installed."""
+    success, output, stderr = run_command_streaming(["uv", "sync"], print)
+
+    assert success is False
+    assert stderr == "Command not found: uv"
+
+
 @patch("wr_cli.setup.utils.command_exists")
 @patch("wr_cli.setup.utils.run_command")
 def test_get_node_version_success(mock_run_command, mock_command_exists):
     """Test get_node_version when node is available."""
-    mock_command_exists.return_value = True
+    mock_command_exists.side_effect = lambda cmd: cmd == "node"
     mock_run_command.return_value = (True, "v18.17.0", "")
-    
+
     version = get_node_version()
     assert version == "v18.17.0"
-    mock_run_command.assert_called_once_with(["node", "--version"])
+    mock_run_command.assert_called_once_with(["node", "--version"], posix_spawn=True)
 
 
 @patch("wr_cli.setup.utils.command_exists")
 def test_get_node_version_not_installed(mock_command_exists):
     """Test get_node_version when node is not installed."""
     mock_command_exists.return_value = False
-    
+
     version = get_node_version()
     assert version is None
     mock_command_exists.assert_called_once_with("node")
@@ -208,88 +295,312 @@ def test_get_node_version_not_installed(mock_command_exists):
 @patch("wr_cli.setup.utils.run_command")
 def test_get_node_version_failure(mock_run_command, mock_command_exists):
     """Test get_node_version when node command fails."""
-    mock_command_exists.return_value = True
+    mock_command_exists.side_effect = lambda cmd: cmd == "node"
     mock_run_command.return_value = (False, "", "command not found")
-    
+
     version = get_node_version()
     assert version is None
 
 
-@patch("wr_cli.setup.utils.command_exists")
-@patch("wr_cli.setup.utils.run_command")
-def test_get_python_executable_success(mock_run_command, mock_command_exists):
-    """Test get_python_executable when Python 3.11+ is available."""
-    mock_command_exists.side_effect = lambda cmd: cmd == "python3.11"
-    mock_run_command.return_value = (True, "Python 3.11.5", "")
-    
-    executable = get_python_executable()
-    assert executable == "python3.11"
-
-
-@patch("wr_cli.setup.utils.command_exists")
-@patch("wr_cli.setup.utils.run_command")
-def test_get_python_executable_fallback_to_python3(mock_run_command, mock_command_exists):
-    """Test get_python_executable falls back to python3 when specific version not found."""
-    # python3.11 doesn't exist, python3 does and has correct version
-    mock_command_exists.side_effect = lambda cmd: cmd == "python3"
-    mock_run_command.return_value = (True, "Python 3.11.5", "")
-    
-    executable = get_python_executable()
-    assert executable == "python3"
-
-
-@patch("wr_cli.setup.utils.command_exists")
-def test_get_python_executable_no_suitable_version(mock_command_exists):
-    """Test get_python_executable when no suitable Python version is found."""
-    mock_command_exists.return_value = False
-    
-    executable = get_python_executable()
-    assert executable is None
+@patch("wr_cli.setup.utils.probe_versions")
+def test_get_python_executable_uses_own_interpreter(mock_probe):
+    """Test the interpreter running the CLI is used without probing."""
+    assert get_python_executable() == sys.executable
+    mock_probe.assert_not_called()
+
+
+def test_get_python_executable_unknown_interpreter(monkeypatch):
+    """Test None is returned when Python can't say where its interpreter is."""
+    monkeypatch.setattr("wr_cli.setup.utils.sys.executable", "")
+    assert get_python_executable() is None
+
+
+@patch("wr_cli.setup.utils._binary_signature", return_value=["/usr/bin/node", 1])
+@patch("wr_cli.setup.utils.command_exists", side_effect=lambda cmd: cmd == "node")
+@patch("wr_cli.setup.utils.run_command", return_value=(True, "v18.17.0", ""))
+def test_probe_versions_reuses_disk_cache(
+    mock_run_command, mock_command_exists, mock_signature
+):
+    """Test a later process reads versions from disk until the binary changes."""
+    assert probe_versions()["node"] == "v18.17.0"
+
+    # Forgetting the in-process copy simulates a new wr invocation
+    clear_command_cache()
+    assert probe_versions()["node"] == "v18.17.0"
+    mock_run_command.assert_called_once_with(["node", "--version"], posix_spawn=True)
+
+    # A different binary, e.g. after an upgrade, is probed again
+    mock_signature.return_value = ["/usr/bin/node", 2]
+    clear_command_cache()
+    probe_versions()
+    assert mock_run_command.call_count == 2
+
+
+@patch("wr_cli.setup.utils._PROBE_CACHE_TTL", 0)
+@patch("wr_cli.setup.utils._binary_signature", return_value=["/usr/bin/node", 1])
+@patch("wr_cli.setup.utils.command_exists", side_effect=lambda cmd: cmd == "node")
+@patch("wr_cli.setup.utils.run_command", return_value=(True, "v18.17.0", ""))
+def test_probe_versions_expires_disk_cache(
+    mock_run_command, mock_command_exists, mock_signature
+):
+    """Test cached versions older than the TTL are probed again."""
+    probe_versions()
+    clear_command_cache()
+    probe_versions()
+    assert mock_run_command.call_count == 2
+
+
+@pytest.mark.parametrize(
+    "entry",
+    [
+        {"binary": ["/usr/bin/node", 1], "version": "v1", "captured_at": None},
+        {"binary": ["/usr/bin/node", 1], "version": "v1", "captured_at": "today"},
+        # Captured "in the future", so only the version's type is wrong
+        {"binary": ["/usr/bin/node", 1], "version": 18, "captured_at": 2**40},
+        ["/usr/bin/node", 1],
+    ],
+    ids=["null_time", "string_time", "int_version", "not_a_dict"],
+)
+@patch("wr_cli.setup.utils._binary_signature", return_value=["/usr/bin/node", 1])
+@patch("wr_cli.setup.utils.command_exists", side_effect=lambda cmd: cmd == "node")
+@patch("wr_cli.setup.utils.run_command", return_value=(True, "v18.17.0", ""))
+def test_probe_versions_ignores_malformed_cache_entry(
+    mock_run_command, mock_command_exists, mock_signature, entry
+):
+    """Test a hand-edited cache entry is probed again instead of crashing."""
+    cache.write_json("probe.json", {"node": entry})
+
+    assert probe_versions()["node"] == "v18.17.0"
+    mock_run_command.assert_called_once_with(["node", "--version"], posix_spawn=True)
+
+
+@patch("wr_cli.setup.utils._binary_signature", return_value=["/usr/bin/node", 1])
+@patch("wr_cli.setup.utils.command_exists", side_effect=lambda cmd: cmd == "node")
+@patch("wr_cli.setup.utils.run_command", return_value=(True, "v18.17.0", ""))
+def test_clear_version_cache_removes_disk_cache(
+    mock_run_command, mock_command_exists, mock_signature
+):
+    """Test clear_version_cache makes the next probe run the command again."""
+    probe_versions()
+    clear_version_cache()
+    probe_versions()
+    assert mock_run_command.call_count == 2
 
 
 def test_get_system_info_actual_values():
     """Test get_system_info returns actual system values."""
     info = get_system_info()
-    
+
     # Verify the structure and that values match actual system info
     assert isinstance(info["platform"], str)
     assert isinstance(info["architecture"], str)
     assert isinstance(info["python_version"], str)
-    
+
     # Verify values match what we expect from system calls
     assert info["platform"] == platform.system()
     assert info["architecture"] == platform.machine()
     assert info["python_version"] == platform.python_version()
 
 
-@patch("shutil.which")  
+@patch("wr_cli.setup.utils._search_path")
 def test_command_exists_with_which(mock_which):
-    """Test command_exists using shutil.which."""
+    """Test command_exists falls back to searching PATH."""
     mock_which.return_value = "/usr/bin/test-command"
-    
+
     result = command_exists("test-command")
-    
+
     assert result is True
     mock_which.assert_called_once_with("test-command")
 
 
-@patch("shutil.which")
+@patch("wr_cli.setup.utils._search_path")
 def test_command_exists_not_found(mock_which):
     """Test command_exists when command is not found."""
     mock_which.return_value = None
-    
+
     result = command_exists("nonexistent-command")
-    
+
     assert result is False
     mock_which.assert_called_once_with("nonexistent-command")
 
 
+@patch("wr_cli.setup.utils._search_path")
+def test_command_exists_is_cached(mock_which):
+    """Test command_exists looks each command up once until the cache is cleared."""
+    mock_which.return_value = "/usr/bin/ghstack"
+
+    assert command_exists("ghstack") is True
+    assert command_exists("ghstack") is True
+    mock_which.assert_called_once_with("ghstack")
+
+    clear_command_cache()
+    assert command_exists("ghstack") is True
+    assert mock_which.call_count == 2
+
+
+@pytest.mark.parametrize("command", ["tool", "tool.sh", "missing", "subdir"])
+def test_search_path_matches_shutil_which(tmp_path, monkeypatch, command):
+    """Test the PATH search finds the same executables as shutil.which."""
+    first, second = tmp_path / "first", tmp_path / "second"
+    first.mkdir()
+    second.mkdir()
+    (first / "tool").write_text("not executable")
+    (second / "tool").write_text("#!/bin/sh\n")
+    (second / "tool").chmod(0o755)
+    (first / "tool.sh").write_text("#!/bin/sh\n")
+    (first / "tool.sh").chmod(0o755)
+    (first / "subdir").mkdir()
+    monkeypatch.setenv("PATH", os.pathsep.join([str(first), str(second)]))
+
+    assert _search_path(command) == shutil.which(command)
+
+
+@patch("wr_cli.setup.utils._search_path", return_value="/usr/bin/found")
+def test_forget_command_only_drops_that_command(mock_which):
+    """Test forgetting one command keeps the other cached lookups."""
+    command_exists("ghstack")
+    command_exists("pre-commit")
+
+    forget_command("ghstack")
+    command_exists("ghstack")
+    command_exists("pre-commit")
+
+    assert [c.args[0] for c in mock_which.call_args_list] == [
+        "ghstack",
+        "pre-commit",
+        "ghstack",
+    ]
+
+
+@patch("wr_cli.setup.utils._search_path", return_value=None)
+def test_remember_command_skips_path_search(mock_which):
+    """Test a command installed to a known path is found without a PATH search."""
+    assert command_exists("ghstack") is False
+    remember_command("ghstack", "/home/user/.local/bin/ghstack")
+
+    assert command_exists("ghstack") is True
+    assert _command_paths["ghstack"] == "/home/user/.local/bin/ghstack"
+    mock_which.assert_called_once_with("ghstack")
+
+
+def test_prewarm_commands_walks_path_once(tmp_path, monkeypatch):
+    """Test prewarmed commands are answered without per-command PATH lookups."""
+    first, second = tmp_path / "first", tmp_path / "second"
+    for directory, name in ((first, "node"), (second, "node"), (second, "uv")):
+        directory.mkdir(exist_ok=True)
+        (directory / name).write_text("#!/bin/sh\n")
+        (directory / name).chmod(0o755)
+    (first / "ghstack").write_text("not executable")
+    monkeypatch.setenv("PATH", os.pathsep.join([str(first), str(second)]))
+    mock_which = MagicMock()
+    monkeypatch.setattr("wr_cli.setup.utils._search_path", mock_which)
+
+    prewarm_commands(["node", "uv", "ghstack"])
+
+    # The first directory on PATH wins, and non-executables are skipped
+    assert _command_paths == {
+        "node": str(first / "node"),
+        "uv": str(second / "uv"),
+        "ghstack": None,
+    }
+    assert command_exists("uv") is True
+    assert command_exists("ghstack") is False
+    mock_which.assert_not_called()
+
+    clear_command_cache()
+    assert _command_paths == {}
+
+
+def test_search_path_lists_each_directory_once(tmp_path, monkeypatch):
+    """Test PATH is indexed once, and again after a command is installed."""
+    (tmp_path / "node").write_text("#!/bin/sh\n")
+    (tmp_path / "node").chmod(0o755)
+    monkeypatch.setenv("PATH", str(tmp_path))
+    scandir = MagicMock(wraps=os.scandir)
+    monkeypatch.setattr("wr_cli.setup.utils.os.scandir", scandir)
+
+    assert _search_path("node") == str(tmp_path / "node")
+    assert _search_path("ghstack") is None
+    assert scandir.call_count == 1
+
+    (tmp_path / "ghstack").write_text("#!/bin/sh\n")
+    (tmp_path / "ghstack").chmod(0o755)
+    forget_command("ghstack")
+    assert _search_path("ghstack") == str(tmp_path / "ghstack")
+    assert scandir.call_count == 2
+
+
+@pytest.mark.parametrize(
+    "system,machine,libc,expected",
+    [
+        ("Linux", "x86_64", "glibc", "x86_64-unknown-linux-gnu"),
+        ("Linux", "aarch64", "", "aarch64-unknown-linux-musl"),
+        ("Darwin", "arm64", "", "aarch64-apple-darwin"),
+        ("Linux", "riscv64", "glibc", None),
+        ("Windows", "AMD64", "", None),
+    ],
+)
+def test_uv_release_target(monkeypatch, system, machine, libc, expected):
+    """Test each supported system maps to the matching uv build."""
+    monkeypatch.setattr("platform.system", lambda: system)
+    monkeypatch.setattr("platform.machine", lambda: machine)
+    monkeypatch.setattr("platform.libc_ver", lambda: (libc, ""))
+    assert uv_release_target() == expected
+
+
+def _uv_archive():
+    """Build a small stand-in for a uv release tarball."""
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w:gz") as tar:
+        for name, content in (("uv", b"uv binary"), ("uvx", b"uvx binary")):
+            info = tarfile.TarInfo(f"uv-x86_64-unknown-linux-gnu/{name}")
+            info.size = len(content)
+            tar.addfile(info, io.BytesIO(content))
+    return buffer.getvalue()
+
+
+def _serve_uv_release(monkeypatch, archive, digest):
+    """Make urlopen return the archive and a checksum file with the digest."""
+    responses = {
+        "uv-x86_64-unknown-linux-gnu.tar.gz": archive,
+        "uv-x86_64-unknown-linux-gnu.tar.gz.sha256": f"{digest}  uv.tar.gz\n".encode(),
+    }
+    monkeypatch.setattr(
+        "urllib.request.urlopen",
+        lambda url, timeout: io.BytesIO(responses[url.rsplit("/", 1)[1]]),
+    )
+
+
+def test_install_uv_release_ok(tmp_path, monkeypatch):
+    """Test a release matching its checksum is unpacked into the bin directory."""
+    archive = _uv_archive()
+    _serve_uv_release(monkeypatch, archive, hashlib.sha256(archive).hexdigest())
+    bin_dir = tmp_path / "bin"
+
+    installed = install_uv_release("x86_64-unknown-linux-gnu", bin_dir)
+
+    assert installed == [bin_dir / "uv", bin_dir / "uvx"]
+    assert (bin_dir / "uv").read_bytes() == b"uv binary"
+    assert os.access(bin_dir / "uvx", os.X_OK)
+    assert sorted(p.name for p in bin_dir.iterdir()) == ["uv", "uvx"]
+
+
+def test_install_uv_release_bad_checksum(tmp_path, monkeypatch):
+    """Test a release not matching its checksum is rejected before unpacking."""
+    _serve_uv_release(monkeypatch, _uv_archive(), hashlib.sha256(b"other").hexdigest())
+    bin_dir = tmp_path / "bin"
+
+    with pytest.raises(ValueError, match="Checksum mismatch"):
+        install_uv_release("x86_64-unknown-linux-gnu", bin_dir)
+    assert not bin_dir.exists()
+
+
 def test_ensure_directory(tmp_path):
     """Test ensure_directory creates directories."""
     test_dir = tmp_path / "test" / "nested" / "dir"
-    
+
     ensure_directory(test_dir)
-    
+
     assert test_dir.exists()
     assert test_dir.is_dir()
 
@@ -298,9 +609,9 @@ def test_ensure_directory_already_exists(tmp_path):
     """Test ensure_directory with existing directory."""
     test_dir = tmp_path / "existing"
     test_dir.mkdir()
-    
+
     # Should not raise an error
     ensure_directory(test_dir)
-    
+
     assert test_dir.exists()
     assert test_dir.is_dir()
@@ -0,0 +1,71 @@
+"""On-disk cache shared between WR CLI invocations."""
+
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Optional
+
+
+def cache_dir() -> Path:
+    """Get the directory WR CLI keeps its cache files in.
+
+    Returns:
+        ``$XDG_CACHE_HOME/wr-cli``, or ``~/.cache/wr-cli`` if unset
+    """
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "wr-cli"
+
+
+def read_json(name: str) -> Optional[Any]:
+    """Read a JSON cache file.
+
+    Args:
+        name: File name inside the cache directory
+
+    Returns:
+        The decoded data, or None if the file is missing or unreadable
+    """
+    try:
+        with open(cache_dir() / name, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def write_json(name: str, data: Any) -> None:
+    """Write a JSON cache file atomically.
+
+    The data is written to a temporary file that then replaces the cache
+    file, so a concurrent reader never sees a partial write. The cache is
+    best-effort: errors writing it, or data JSON can't represent, are ignored.
+
+    Args:
+        name: File name inside the cache directory
+        data: JSON-serializable data to store
+    """
+    directory = cache_dir()
+    try:
+        directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{name}.")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, directory / name)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+    except (OSError, TypeError, ValueError):
+        pass
+
+
+def remove(name: str) -> None:
+    """Delete a cache file if it exists.
+
+    Args:
+        name: File name inside the cache directory
+    """
+    try:
+        (cache_dir() / name).unlink()
+    except OSError:
+        pass
@@ -1,15 +1,78 @@
 """Command execution functionality for WR CLI."""
 
+import os
+import re
+import shlex
 import subprocess
 import sys
-from typing import Any, Dict
+import threading
+from typing import IO, Any, Dict, List, Optional, cast
 
 from rich.console import Console
 
+# Characters that only mean something to a shell: pipes, redirects, command
+# lists, substitutions, globs, tilde and brace expansion, comments
+_SHELL_SYNTAX = re.compile(r"[|&;<>()$`*?\[\]{}~#\n]")
+
+
+def _split_command(command: str) -> Optional[List[str]]:
+    """Split a command into an argument list if it can run without a shell.
+
+    Args:
+        command: Command string from wr.yml
+
+    Returns:
+        The argument list, or None if the command needs a shell
+    """
+    if os.name == "nt" or _SHELL_SYNTAX.search(command):
+        return None
+    try:
+        argv = shlex.split(command)
+    except ValueError:
+        return None
+    return argv or None
+
+
+def _spawn(command: str) -> "subprocess.Popen[str]":
+    """Start a command with piped output, skipping the shell when possible.
+
+    Args:
+        command: Command string from wr.yml
+
+    Returns:
+        The running process
+    """
+    argv = _split_command(command)
+    if argv is not None:
+        try:
+            return subprocess.Popen(
+                argv, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True
+            )
+        except OSError:
+            # Not something we can exec: a builtin like ':' or 'cd', an
+            # environment assignment, or a script without the execute bit.
+            # The shell knows what to do with it, or reports why it can't.
+            pass
+    return subprocess.Popen(
+        command,
+        shell=True,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+
+
+def _read_into(pipe: IO[str], chunks: List[str]) -> None:
+    """Read a pipe to EOF and append its contents to chunks."""
+    chunks.append(pipe.read())
+
 
 def run_command(command_name: str, config: Dict[str, Any], console: Console) -> None:
     """Run a command defined in the configuration.
 
+    The command's stdout is printed line by line as it runs. If it fails,
+    its stderr is printed and the process exits with the command's code.
+
     Args:
         command_name: Name of the command to run
         config: Configuration dictionary loaded from wr.yml
@@ -17,7 +80,6 @@ def run_command(command_name: str, config: Dict[str, Any], console: Console) ->
 
     Raises:
         ValueError: If the command is not found in the configuration
-        subprocess.CalledProcessError: If the command execution fails
     """
     commands = config.get("commands", {})
 
@@ -31,30 +93,30 @@ def run_command(command_name: str, config: Dict[str, Any], console: Console) ->
     command = commands[command_name]
     console.print(f"[blue]Running:[/blue] {command}")
 
-    try:
-        result = subprocess.run(
-            command,
-            shell=True,
-            check=True,
-            text=True,
-            capture_output=True,
+    with _spawn(command) as process:
+        # Drain stderr on a separate thread so a chatty stderr can't fill its
+        # pipe and block the command while stdout is being streamed
+        stderr_chunks: List[str] = []
+        stderr_reader = threading.Thread(
+            target=_read_into, args=(process.stderr, stderr_chunks), daemon=True
         )
+        stderr_reader.start()
 
-        if result.stdout:
-            console.print(result.stdout)
+        # Show output as it is produced rather than after the command exits
+        for line in cast(IO[str], process.stdout):
+            console.print(line, end="")
 
-        console.print(
-            f"[green]✓ Command '{command_name}' completed successfully[/green]"
-        )
+        returncode = process.wait()
+        stderr_reader.join()
+    stderr = "".join(stderr_chunks)
 
-    except subprocess.CalledProcessError as e:
+    if returncode != 0:
         console.print(
-            f"[red]✗ Command '{command_name}' failed with exit code {e.returncode}[/red]"
+            f"[red]✗ Command '{command_name}' failed with exit code {returncode}[/red]"
         )
-        if e.stdout:
-            console.print("[yellow]stdout:[/yellow]")
-            console.print(e.stdout)
-        if e.stderr:
+        if stderr:
             console.print("[red]stderr:[/red]")
-            console.print(e.stderr)
-        sys.exit(e.returncode)
+            console.print(stderr)
+        sys.exit(returncode)
+
+    console.print(f"[green]✓ Command '{command_name}' completed successfully[/green]")
@@ -1,14 +1,46 @@
 """Configuration management for WR CLI."""
 
+import copy
+import functools
+import hashlib
+import json
 from pathlib import Path
 from typing import Any, Dict
 
 import yaml
 
+from . import cache
+
+# Prefer the libyaml-backed loader; PyYAML only provides it when built against
+# libyaml, so fall back to the pure-Python SafeLoader otherwise
+try:
+    from yaml import CSafeLoader as _SafeLoader
+except ImportError:  # pragma: no cover - depends on how PyYAML was built
+    from yaml import SafeLoader as _SafeLoader  # type: ignore[assignment]
+
+
+@functools.lru_cache(maxsize=32)
+def _parse_config(path: str, mtime_ns: int, size: int) -> Dict[str, Any]:
+    """Parse a YAML config file, memoized on its path and stat signature.
+
+    Args:
+        path: Absolute path to the config file
+        mtime_ns: Modification time of the file in nanoseconds
+        size: Size of the file in bytes
+
+    Returns:
+        Dictionary containing the configuration data
+    """
+    with open(path, "r") as f:
+        return yaml.load(f, Loader=_SafeLoader) or {}
+
 
 def load_config(config_path: Path) -> Dict[str, Any]:
     """Load configuration from a YAML file.
 
+    Repeated loads of an unchanged file are served from an in-process cache
+    keyed on the file's modification time and size.
+
     Args:
         config_path: Path to the wr.yml configuration file
 
@@ -19,5 +51,56 @@ def load_config(config_path: Path) -> Dict[str, Any]:
         FileNotFoundError: If the config file doesn't exist
         yaml.YAMLError: If the config file is invalid YAML
     """
-    with open(config_path, "r") as f:
-        return yaml.safe_load(f) or {}
+    path = Path(config_path).absolute()
+    stat = path.stat()
+    # Hand out a copy so callers can't mutate the cached parse
+    return copy.deepcopy(_parse_config(str(path), stat.st_mtime_ns, stat.st_size))
+
+
+def _survives_json(config: Dict[str, Any]) -> bool:
+    """Check a parsed config comes back unchanged from a JSON round trip.
+
+    JSON turns non-string keys into strings and can't hold values such as
+    dates, so a config using them must not be served from the disk cache.
+    """
+    try:
+        return bool(json.loads(json.dumps(config)) == config)
+    except (TypeError, ValueError):
+        return False
+
+
+def load_config_cached(config_path: Path) -> Dict[str, Any]:
+    """Load configuration, reusing the parse from a previous invocation.
+
+    The parsed config is kept in the on-disk cache alongside the file's
+    modification time and size, so running ``wr`` repeatedly against an
+    unchanged wr.yml skips the YAML parse entirely. Configs that JSON can't
+    represent exactly, such as ones with integer keys, are not cached.
+
+    Args:
+        config_path: Path to the wr.yml configuration file
+
+    Returns:
+        Dictionary containing the configuration data
+
+    Raises:
+        FileNotFoundError: If the config file doesn't exist
+        yaml.YAMLError: If the config file is invalid YAML
+    """
+    path = Path(config_path).absolute()
+    stat = path.stat()
+    signature = [stat.st_mtime_ns, stat.st_size]
+    digest = hashlib.sha256(str(path).encode()).hexdigest()[:16]
+    cache_name = f"config-{digest}.json"
+
+    entry = cache.read_json(cache_name)
+    # A truncated or hand-edited entry counts as a miss and is re-parsed
+    if isinstance(entry, dict) and entry.get("signature") == signature:
+        cached = entry.get("config")
+        if isinstance(cached, dict):
+            return cached
+
+    config: Dict[str, Any] = load_config(path)
+    if _survives_json(config):
+        cache.write_json(cache_name, {"signature": signature, "config": config})
+    return config
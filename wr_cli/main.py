@@ -2,19 +2,32 @@
 
 import sys
 from pathlib import Path
-from typing import Optional
+from typing import Any, Dict, Optional
 
 import click
 from rich.console import Console
-from rich.panel import Panel
 
-from .commands import run_command
-from .config import load_config
-from .setup.runner import SetupRunner
+from .config import load_config_cached
 
 console = Console()
 
 
+def _load_config(config_path: Path) -> Dict[str, Any]:
+    """Load wr.yml, exiting with an error if it doesn't exist.
+
+    Args:
+        config_path: Path to the wr.yml configuration file
+
+    Returns:
+        Dictionary containing the configuration data
+    """
+    try:
+        return load_config_cached(config_path)
+    except FileNotFoundError:
+        console.print(f"[red]Error: Config file '{config_path}' not found.[/red]")
+        sys.exit(1)
+
+
 @click.group()
 @click.version_option()
 def cli() -> None:
@@ -31,16 +44,23 @@ def cli() -> None:
 )
 @click.option("--verbose", "-v", is_flag=True, help="Enable verbose output")
 @click.option("--config", "-c", help="Path to wr.yml config file", default="wr.yml")
-def setup(force: bool, verbose: bool, config: str) -> None:
+@click.option(
+    "--keep-going",
+    "-k",
+    is_flag=True,
+    help="Run every step even if a step it depends on failed",
+)
+def setup(force: bool, verbose: bool, config: str, keep_going: bool) -> None:
     """Set up the development environment."""
-    config_path = Path(config)
+    # Imported here so `wr run` and `wr --help` don't load every setup step
+    from rich.panel import Panel
 
-    if not config_path.exists():
-        console.print(f"[red]Error: Config file '{config_path}' not found.[/red]")
-        sys.exit(1)
+    from .setup.runner import SetupRunner
+
+    config_path = Path(config)
 
     try:
-        config_data = load_config(config_path)
+        config_data = _load_config(config_path)
         project_name = config_data.get("project_name", "unknown-project")
     except Exception as e:
         console.print(f"[red]Error loading config: {e}[/red]")
@@ -55,7 +75,11 @@ def setup(force: bool, verbose: bool, config: str) -> None:
     )
 
     runner = SetupRunner(
-        console=console, verbose=verbose, force=force, project_name=project_name
+        console=console,
+        verbose=verbose,
+        force=force,
+        project_name=project_name,
+        keep_going=keep_going,
     )
 
     try:
@@ -89,14 +113,12 @@ def setup(force: bool, verbose: bool, config: str) -> None:
 @click.option("--config", "-c", help="Path to wr.yml config file")
 def run(command_name: str, config: Optional[str]) -> None:
     """Run a command defined in wr.yml."""
-    config_path = Path(config) if config else Path("wr.yml")
+    from .commands import run_command
 
-    if not config_path.exists():
-        console.print(f"[red]Error: Config file '{config_path}' not found.[/red]")
-        sys.exit(1)
+    config_path = Path(config) if config else Path("wr.yml")
 
     try:
-        config_data = load_config(config_path)
+        config_data = _load_config(config_path)
         run_command(command_name, config_data, console)
     except Exception as e:
         console.print(f"[red]Error running command: {e}[/red]")
@@ -1,12 +1,22 @@
 """Base classes for setup steps."""
 
 from abc import ABC, abstractmethod
+from typing import ClassVar, Tuple
+
 from rich.console import Console
 
 
 class SetupStep(ABC):
     """Base class for all setup steps."""
 
+    # Read-only checks set this so the runner may run them alongside
+    # neighbouring parallel-safe steps; anything that installs or writes stays False
+    parallel_safe: bool = False
+    # Commands the step looks up, so the runner can resolve them all up front
+    required_commands: ClassVar[Tuple[str, ...]] = ()
+    # Names of earlier steps this one needs; it is skipped if any of them fail
+    depends_on: ClassVar[Tuple[str, ...]] = ()
+
     def __init__(self, console: Console, verbose: bool = False) -> None:
         """Initialize the setup step.
 
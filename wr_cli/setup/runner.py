@@ -1,8 +1,10 @@
 """Setup runner that orchestrates all setup steps."""
 
-from typing import List
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Tuple, Type
 
 from rich.console import Console
+from rich.text import Text
 
 from ..setup import SetupStep
 from .steps import (
@@ -15,6 +17,35 @@ from .steps import (
     LockPythonVersionStep,
     SetupGhstackStep,
 )
+from .utils import clear_version_cache, prewarm_commands
+
+# Default setup steps for generic projects
+DEFAULT_STEPS: Tuple[Type[SetupStep], ...] = (
+    CheckNodeJSStep,
+    CheckPythonStep,
+    InstallUvStep,
+    LockPythonVersionStep,
+)
+
+# Setup steps for projects that need more than the defaults
+PROJECT_STEPS: Dict[str, Tuple[Type[SetupStep], ...]] = {
+    "wr-cli": (
+        CheckNodeJSStep,
+        CheckPythonStep,
+        InstallUvStep,
+        InstallGhstackStep,
+        SetupGhstackStep,
+        LockPythonVersionStep,
+    ),
+    "omnibus": (
+        CheckNodeJSStep,
+        CheckPythonStep,
+        InstallUvStep,
+        LockPythonVersionStep,
+        InstallRequirementsStep,
+        InstallLocalPackagesStep,
+    ),
+}
 
 
 class SetupRunner:
@@ -26,6 +57,7 @@ class SetupRunner:
         verbose: bool = False,
         force: bool = False,
         project_name: str = "unknown",
+        keep_going: bool = False,
     ) -> None:
         """Initialize the setup runner.
 
@@ -34,71 +66,144 @@ class SetupRunner:
             verbose: Enable verbose output
             force: Force re-run of steps even if completed
             project_name: Name of the project being set up
+            keep_going: Run steps even if a step they depend on failed
         """
         self.console = console
         self.verbose = verbose
         self.force = force
         self.project_name = project_name
+        self.keep_going = keep_going
 
-        # Define setup steps based on project
-        if project_name == "omnibus":
-            self.steps: List[SetupStep] = self._get_omnibus_steps()
-        elif project_name == "wr-cli":
-            self.steps: List[SetupStep] = self._get_wr_cli_steps()
-        else:
-            # Default setup steps for generic projects
-            self.steps: List[SetupStep] = self._get_default_steps()
-
-    def _get_default_steps(self) -> List[SetupStep]:
-        """Get default setup steps for generic projects."""
-        return [
-            CheckNodeJSStep(self.console, self.verbose),
-            CheckPythonStep(self.console, self.verbose),
-            InstallUvStep(self.console, self.verbose),
-            LockPythonVersionStep(self.console, self.verbose),
+        step_classes = PROJECT_STEPS.get(project_name, DEFAULT_STEPS)
+        self.steps: List[SetupStep] = [
+            step_cls(self.console, self.verbose) for step_cls in step_classes
         ]
 
-    def _get_wr_cli_steps(self) -> List[SetupStep]:
-        """Get setup steps for the WR CLI project."""
-        return [
-            CheckNodeJSStep(self.console, self.verbose),
-            CheckPythonStep(self.console, self.verbose),
-            InstallUvStep(self.console, self.verbose),
-            InstallGhstackStep(self.console, self.verbose),
-            SetupGhstackStep(self.console, self.verbose),
-            LockPythonVersionStep(self.console, self.verbose),
-        ]
+    def _group_steps(self) -> List[List[Tuple[int, SetupStep]]]:
+        """Split the numbered steps into groups that can run together.
 
-    def _get_omnibus_steps(self) -> List[SetupStep]:
-        """Get setup steps for the Omnibus project."""
-        return [
-            CheckNodeJSStep(self.console, self.verbose),
-            CheckPythonStep(self.console, self.verbose),
-            InstallUvStep(self.console, self.verbose),
-            LockPythonVersionStep(self.console, self.verbose),
-            InstallRequirementsStep(self.console, self.verbose),
-            InstallLocalPackagesStep(self.console, self.verbose),
-        ]
+        Consecutive parallel-safe steps share a group, unless a step depends
+        on one already in the group; every other step is a group of its own,
+        so ordering between dependent steps is kept.
+
+        Returns:
+            List of groups of (step number, step) pairs
+        """
+        groups: List[List[Tuple[int, SetupStep]]] = []
+        for i, step in enumerate(self.steps, 1):
+            if (
+                step.parallel_safe
+                and groups
+                and groups[-1][-1][1].parallel_safe
+                and not any(other.name in step.depends_on for _, other in groups[-1])
+            ):
+                groups[-1].append((i, step))
+            else:
+                groups.append([(i, step)])
+        return groups
+
+    def _run_step(self, i: int, step: SetupStep) -> bool:
+        """Print the step counter and run a single step."""
+        self.console.print(f"[dim]({i}/{len(self.steps)})[/dim]", end=" ")
+        return step.run(force=self.force)
+
+    def _skip_step(self, i: int, step: SetupStep, blocked_by: List[str]) -> None:
+        """Report a step that won't run because a step it needs failed."""
+        self.console.print(f"[dim]({i}/{len(self.steps)})[/dim]", end=" ")
+        self.console.print(
+            f"[yellow]⊘ {step.name}[/yellow] skipped "
+            f"(needs {', '.join(blocked_by)})"
+        )
+
+    def _run_step_captured(self, i: int, step: SetupStep) -> Tuple[bool, str]:
+        """Run a step, capturing what it prints.
+
+        Rich keeps capture buffers per thread, so steps run concurrently on
+        worker threads do not interleave their output.
+
+        Returns:
+            Tuple of (success, captured output)
+        """
+        self.console.begin_capture()
+        try:
+            success = self._run_step(i, step)
+        finally:
+            output = self.console.end_capture()
+        return success, output
 
     def run_setup(self) -> bool:
         """Run all setup steps.
 
+        Consecutive parallel-safe steps run concurrently; their output is buffered and
+        printed afterwards in step order. Other steps may prompt for input, so their
+        output is printed as it happens. Unless ``keep_going`` is set, a step is skipped
+        when a step in its ``depends_on`` failed or was skipped.
+
         Returns:
             True if all steps completed successfully, False otherwise
         """
         self.console.print(f"[blue]Running {len(self.steps)} setup steps...[/blue]\n")
 
-        failed_steps: list[str] = []
+        if self.force:
+            # Re-probe tool versions instead of trusting the on-disk cache
+            clear_version_cache()
 
-        for i, step in enumerate(self.steps, 1):
-            self.console.print(f"[dim]({i}/{len(self.steps)})[/dim]", end=" ")
+        # Resolve every command the steps look up in one pass over PATH
+        prewarm_commands(
+            {command for step in self.steps for command in step.required_commands}
+        )
 
-            success = step.run(force=self.force)
-            if not success:
-                failed_steps.append(step.name)
+        failed_steps: list[str] = []
+        skipped_steps: list[str] = []
+
+        for group in self._group_steps():
+            runnable: List[Tuple[int, SetupStep]] = []
+            for i, step in group:
+                blocked_by = [
+                    name
+                    for name in step.depends_on
+                    if name in failed_steps or name in skipped_steps
+                ]
+                if blocked_by and not self.keep_going:
+                    self._skip_step(i, step, blocked_by)
+                    skipped_steps.append(step.name)
+                else:
+                    runnable.append((i, step))
+
+            if not runnable:
+                continue
+            if len(runnable) == 1 and not runnable[0][1].parallel_safe:
+                # Steps that install things may prompt, so their output streams
+                i, step = runnable[0]
+                if not self._run_step(i, step):
+                    failed_steps.append(step.name)
+                continue
+
+            if len(runnable) == 1:
+                # Read-only checks never prompt; buffer them into a single write
+                results = [self._run_step_captured(*runnable[0])]
+            else:
+                with ThreadPoolExecutor(max_workers=len(runnable)) as executor:
+                    results = list(
+                        executor.map(
+                            lambda item: self._run_step_captured(*item), runnable
+                        )
+                    )
+
+            for (_, step), (success, output) in zip(runnable, results):
+                if output:
+                    self.console.print(
+                        Text.from_ansi(output.removesuffix("\n")), soft_wrap=True
+                    )
+                if not success:
+                    failed_steps.append(step.name)
 
         if failed_steps:
             self.console.print(f"\n[red]Failed steps: {', '.join(failed_steps)}[/red]")
+            if skipped_steps:
+                self.console.print(
+                    f"[yellow]Skipped steps: {', '.join(skipped_steps)}[/yellow]"
+                )
             return False
 
         self.console.print("\n[green]All setup steps completed successfully![/green]")
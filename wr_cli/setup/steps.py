@@ -1,23 +1,49 @@
 """Setup steps for development environment."""
 
+import functools
 import getpass
+import os
 import platform
 from pathlib import Path
 from typing import Any, List, Optional
 
+from rich.text import Text
+
 from ..setup import SetupStep
 from .utils import (
     command_exists,
+    forget_command,
     get_node_version,
     get_python_executable,
+    install_uv_release,
+    remember_command,
     run_command,
     run_command_interactive,
+    run_command_streaming,
+    uv_release_target,
 )
 
+# How to install each tool, by lowercased platform.system()
+_NODE_INSTALL_HINTS = {
+    "darwin": "Install with: brew install node",
+    "linux": "Install with: sudo apt-get install nodejs npm",
+    "windows": "Download from https://nodejs.org/",
+}
+_PYTHON_INSTALL_HINTS = {
+    "darwin": "Install with: brew install python@3.11",
+    "linux": "Install with: sudo apt-get install python3.11",
+    "windows": "Download from https://python.org/",
+}
+# Read from the directory wr setup runs in
+_PYTHON_VERSION_FILE = Path(".python-version")
+
 
 class CheckNodeJSStep(SetupStep):
     """Ensure Node.js is installed."""
 
+    parallel_safe = True
+    required_commands = ("node",)
+
     @property
     def name(self) -> str:
         return "Check Node.js"
@@ -31,34 +57,23 @@ class CheckNodeJSStep(SetupStep):
 
     def execute(self) -> bool:
         if self.is_completed():
-            version = get_node_version()
+            # Only probe the version when there is somewhere to show it
             if self.verbose:
-                self.console.print(f"  Found Node.js {version}")
+                self.console.print(f"  Found Node.js {get_node_version()}")
             return True
 
-        system = platform.system().lower()
-        if system == "darwin":
-            self.console.print(
-                "[yellow]Node.js not found. Install with: brew install node[/yellow]"
-            )
-        elif system == "linux":
-            self.console.print(
-                "[yellow]Node.js not found. Install with: sudo apt-get install nodejs npm[/yellow]"
-            )
-        elif system == "windows":
-            self.console.print(
-                "[yellow]Node.js not found. Download from https://nodejs.org/[/yellow]"
-            )
-        else:
-            self.console.print(
-                "[yellow]Node.js not found. Please install Node.js from https://nodejs.org/[/yellow]"
-            )
+        hint = _NODE_INSTALL_HINTS.get(
+            platform.system().lower(), "Please install Node.js from https://nodejs.org/"
+        )
+        self.console.print(f"[yellow]Node.js not found. {hint}[/yellow]")
         return False
 
 
 class CheckPythonStep(SetupStep):
     """Ensure Python 3.11+ is installed."""
 
+    parallel_safe = True
+
     @property
     def name(self) -> str:
         return "Check Python"
@@ -71,36 +86,23 @@ class CheckPythonStep(SetupStep):
         return get_python_executable() is not None
 
     def execute(self) -> bool:
-        python_cmd = get_python_executable()
-        if python_cmd:
-            success, version_output, _ = run_command([python_cmd, "--version"])
-            if success and self.verbose:
-                self.console.print(f"  Found {version_output}")
+        if get_python_executable():
+            if self.verbose:
+                self.console.print(f"  Found Python {platform.python_version()}")
             return True
 
-        system = platform.system().lower()
-        if system == "darwin":
-            self.console.print(
-                "[yellow]Python 3.11+ not found. Install with: brew install python@3.11[/yellow]"
-            )
-        elif system == "linux":
-            self.console.print(
-                "[yellow]Python 3.11+ not found. Install with: sudo apt-get install python3.11[/yellow]"
-            )
-        elif system == "windows":
-            self.console.print(
-                "[yellow]Python 3.11+ not found. Download from https://python.org/[/yellow]"
-            )
-        else:
-            self.console.print(
-                "[yellow]Python 3.11+ not found. Please install Python 3.11+[/yellow]"
-            )
+        hint = _PYTHON_INSTALL_HINTS.get(
+            platform.system().lower(), "Please install Python 3.11+"
+        )
+        self.console.print(f"[yellow]Python 3.11+ not found. {hint}[/yellow]")
         return False
 
 
 class InstallUvStep(SetupStep):
     """Install the uv package manager."""
 
+    required_commands = ("uv",)
+
     @property
     def name(self) -> str:
         return "Install uv"
@@ -119,6 +121,7 @@ class InstallUvStep(SetupStep):
         system = platform.system().lower()
 
         try:
+            target = uv_release_target()
             if system == "windows":
                 # Use interactive execution for PowerShell script
                 success, _, stderr = run_command_interactive([
@@ -126,6 +129,14 @@ class InstallUvStep(SetupStep):
                     "-c",
                     "irm https://astral.sh/uv/install.ps1 | iex",
                 ])
+            elif target is not None:
+                # Fetch the release build directly rather than piping the
+                # installer script through curl and sh
+                self.console.print(f"  Downloading uv for {target}")
+                # The install location is known, so the steps that follow
+                # needn't search PATH for it
+                remember_command("uv", str(self._install_release(target)))
+                return True
             else:
                 # Use interactive execution for shell script
                 success, _, stderr = run_command_interactive([
@@ -139,16 +150,41 @@ class InstallUvStep(SetupStep):
                     self.console.print(f"  Error: {stderr}")
                 return False
 
+            forget_command("uv")
             return command_exists("uv")
 
         except Exception as e:
             self.console.print(f"[red]Failed to install uv: {e}[/red]")
             return False
 
+    def _install_release(self, target: str) -> Path:
+        """Install the uv release build into the user's bin directory.
+
+        Returns:
+            Path of the installed uv binary
+        """
+        bin_dir = Path(
+            os.environ.get("XDG_BIN_HOME") or Path.home() / ".local" / "bin"
+        )
+        install_uv_release(target, bin_dir)
+
+        path_dirs = os.environ.get("PATH", "").split(os.pathsep)
+        if str(bin_dir) not in path_dirs:
+            # Let the steps that follow find uv, and tell the user to do the same
+            os.environ["PATH"] = os.pathsep.join([str(bin_dir), *path_dirs])
+            self.console.print(
+                f"[yellow]Add {bin_dir} to your PATH to use uv outside "
+                "wr setup[/yellow]"
+            )
+        return bin_dir / "uv"
+
 
 class InstallGhstackStep(SetupStep):
     """Install ghstack using uv tool."""
 
+    required_commands = ("uv", "ghstack")
+    depends_on = ("Install uv",)
+
     @property
     def name(self) -> str:
         return "Install ghstack"
@@ -170,6 +206,8 @@ class InstallGhstackStep(SetupStep):
 
         success, _, stderr = run_command_interactive(["uv", "tool", "install", "ghstack"])
         if success:
+            # Later steps look ghstack up again and must not see the cached miss
+            forget_command("ghstack")
             return True
 
         self.console.print(f"[red]Failed to install ghstack: {stderr}[/red]")
@@ -179,6 +217,9 @@ class InstallGhstackStep(SetupStep):
 class SetupGhstackStep(SetupStep):
     """Set up ghstack configuration with GitHub token."""
 
+    required_commands = ("ghstack",)
+    depends_on = ("Install ghstack",)
+
     @property
     def name(self) -> str:
         return "Setup ghstack"
@@ -187,16 +228,20 @@ class SetupGhstackStep(SetupStep):
     def description(self) -> str:
         return "Configure ghstack with GitHub authentication"
 
+    @functools.cached_property
+    def _ghstack_config(self) -> Path:
+        """Location of the ghstack config, resolved once per step."""
+        return Path.home() / ".ghstackrc"
+
     def is_completed(self) -> bool:
-        ghstack_config = Path.home() / ".ghstackrc"
-        return ghstack_config.exists()
+        return self._ghstack_config.exists()
 
     def execute(self) -> bool:
         if not command_exists("ghstack"):
             self.console.print("[red]ghstack not installed[/red]")
             return False
 
-        ghstack_config = Path.home() / ".ghstackrc"
+        ghstack_config = self._ghstack_config
         _ = run_command_interactive(["ghstack"])
 
         if ghstack_config.exists():
@@ -241,6 +286,13 @@ github_username = {username}
 class LockPythonVersionStep(SetupStep):
     """Lock Python version using uv based on .python-version file."""
 
+    required_commands = ("uv",)
+    depends_on = ("Install uv",)
+
+    # Looked up once per step, since is_completed() and execute() both need them
+    _target_version: Optional[str] = None
+    _current_version: Optional[str] = None
+
     @property
     def name(self) -> str:
         return "Lock Python version"
@@ -251,20 +303,26 @@ class LockPythonVersionStep(SetupStep):
 
     def _get_target_python_version(self) -> str:
         """Get the target Python version from .python-version file."""
-        python_version_file = Path(".python-version")
-        if python_version_file.exists():
-            return python_version_file.read_text().strip()
-        return "3.11"  # Default fallback
+        if self._target_version is None:
+            try:
+                self._target_version = _PYTHON_VERSION_FILE.read_text().strip()
+            except FileNotFoundError:
+                self._target_version = "3.11"  # Default fallback
+        return self._target_version
 
     def _get_current_python_version(self) -> str:
         """Get the currently active Python version via uv."""
-        success, stdout, _ = run_command(["uv", "python", "--version"])
-        if success and stdout:
-            # Extract version from output like "Python 3.11.13"
-            parts = stdout.strip().split()
-            if len(parts) >= 2 and parts[1]:
-                return parts[1]
-        return ""
+        if self._current_version is None:
+            self._current_version = ""
+            success, stdout, _ = run_command(
+                ["uv", "python", "--version"], posix_spawn=True
+            )
+            if success and stdout:
+                # Extract version from output like "Python 3.11.13"
+                parts = stdout.strip().split()
+                if len(parts) >= 2 and parts[1]:
+                    self._current_version = parts[1]
+        return self._current_version
 
     def is_completed(self) -> bool:
         target_version = self._get_target_python_version()
@@ -288,26 +346,43 @@ class LockPythonVersionStep(SetupStep):
 
         target_version = self._get_target_python_version()
         
-        # Install the target Python version via uv if not available
-        success, _, stderr = run_command_interactive(["uv", "python", "install", target_version], show_command=False)
-        if not success and "already installed" not in stderr.lower():
-            self.console.print(f"[red]Failed to install Python {target_version}: {stderr}[/red]")
+        # Install the target Python version via uv (a no-op if it already
+        # has it). uv reports its own errors on the terminal, as nothing is
+        # captured from interactive commands.
+        success, _, _ = run_command_interactive(
+            ["uv", "python", "install", target_version], show_command=False
+        )
+        if not success:
+            self.console.print(
+                f"[red]Failed to install Python {target_version}; "
+                "see the uv output above[/red]"
+            )
             return False
 
         # Pin the project to use the target version
-        success, _, stderr = run_command_interactive(["uv", "python", "pin", target_version], show_command=False)
-        if success:
-            if self.verbose:
-                self.console.print(f"  Pinned Python version to {target_version}")
-            return True
+        success, _, _ = run_command_interactive(
+            ["uv", "python", "pin", target_version], show_command=False
+        )
+        if not success:
+            self.console.print(
+                f"[red]Failed to pin Python {target_version}; "
+                "see the uv output above[/red]"
+            )
+            return False
 
-        self.console.print(f"[red]Failed to pin Python version: {stderr}[/red]")
-        return False
+        # The active version has just changed
+        self._current_version = None
+        if self.verbose:
+            self.console.print(f"  Pinned Python version to {target_version}")
+        return True
 
 
 class InstallRequirementsStep(SetupStep):
     """Install dependencies from requirements.txt using uv sync."""
 
+    required_commands = ("uv",)
+    depends_on = ("Install uv", "Lock Python version")
+
     @property
     def name(self) -> str:
         return "Sync dependencies"
@@ -317,30 +392,46 @@ class InstallRequirementsStep(SetupStep):
         return "Install and sync project dependencies"
 
     def is_completed(self) -> bool:
-        uv_lock = Path("uv.lock")
-        pyproject = Path("pyproject.toml")
-
-        if not uv_lock.exists() or not pyproject.exists():
+        # One stat per file, treating a missing file as out of date
+        try:
+            lock_mtime = os.stat("uv.lock").st_mtime
+            pyproject_mtime = os.stat("pyproject.toml").st_mtime
+        except OSError:
             return False
 
-        return uv_lock.stat().st_mtime >= pyproject.stat().st_mtime
+        return lock_mtime >= pyproject_mtime
 
     def execute(self) -> bool:
         if not command_exists("uv"):
             self.console.print("[red]uv not installed[/red]")
             return False
 
-        success, _, stderr = run_command_interactive(["uv", "sync"], show_command=False)
+        # uv's output comes through the step's console, so it is captured
+        # and ordered along with the rest of the step's output
+        success, _, error = run_command_streaming(
+            ["uv", "sync", "--color=always"],
+            lambda line: self.console.print(Text.from_ansi(line)),
+        )
         if success:
             return True
 
-        self.console.print(f"[red]Failed to sync dependencies: {stderr}[/red]")
+        if error:
+            # uv couldn't be started at all
+            self.console.print(f"[red]Failed to sync dependencies: {error}[/red]")
+        else:
+            # uv's own errors have already been printed with the rest of its output
+            self.console.print(
+                "[red]Failed to sync dependencies; see the uv output above[/red]"
+            )
         return False
 
 
 class InstallLocalPackagesStep(SetupStep):
     """Install omnibus and parsley libraries from local directories."""
 
+    required_commands = ("uv",)
+    depends_on = ("Install uv", "Sync dependencies")
+
     def __init__(
         self, console: Any, verbose: bool, packages: Optional[List[str]] = None
     ) -> None:
@@ -363,13 +454,15 @@ class InstallLocalPackagesStep(SetupStep):
             self.console.print("[red]uv not installed[/red]")
             return False
 
-        success_count = 0
+        to_add = []
+        any_existed = False
         for package in self.packages:
             package_dir = Path(package).resolve()  # Use absolute path
             if not package_dir.exists():
                 if self.verbose:
                     self.console.print(f"  {package}/ directory not found, skipping")
                 continue
+            any_existed = True
 
             # Check if it has a pyproject.toml to confirm it's a valid Python package
             if not (package_dir / "pyproject.toml").exists():
@@ -377,17 +470,31 @@ class InstallLocalPackagesStep(SetupStep):
                     self.console.print(f"  {package}/ has no pyproject.toml, skipping")
                 continue
 
-            success, _, stderr = run_command_interactive([
-                "uv", "add", "--editable", f"./{package}"
-            ], show_command=False)
+            to_add.append(package)
 
-            if success:
-                success_count += 1
-                if self.verbose:
+        if not to_add:
+            # Nothing to do is fine, unless a directory wasn't a valid package
+            return not any_existed
+
+        # Add every package in one uv call so they are resolved together
+        command = ["uv", "add"]
+        for package in to_add:
+            command += ["--editable", f"./{package}"]
+        success, _, error = run_command_interactive(command, show_command=False)
+
+        if success:
+            if self.verbose:
+                for package in to_add:
                     self.console.print(f"  Added {package} as editable dependency")
-            else:
-                self.console.print(f"[red]Failed to add {package}: {stderr}[/red]")
-                if self.verbose and stderr:
-                    self.console.print(f"  Error details: {stderr}")
+            return True
 
-        return success_count > 0 or all(not Path(pkg).exists() for pkg in self.packages)
+        packages = ", ".join(to_add)
+        if error:
+            # uv couldn't be started at all
+            self.console.print(f"[red]Failed to add {packages}: {error}[/red]")
+        else:
+            # uv's own errors have already been printed on the terminal
+            self.console.print(
+                f"[red]Failed to add {packages}; see the uv output above[/red]"
+            )
+        return False
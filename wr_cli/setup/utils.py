@@ -1,10 +1,49 @@
 """Utilities for setup steps."""
 
+import functools
+import os
 import platform
 import shutil
 import subprocess
+import sys
+import threading
+import time
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import (
+    IO,
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    Union,
+    cast,
+)
+
+from .. import cache
+
+# Commands whose --version output setup steps need
+_VERSION_PROBES = ("node",)
+_probe_lock = threading.Lock()
+# Probe results are reused across runs for a day while the binary is unchanged
+_PROBE_CACHE_FILE = "probe.json"
+_PROBE_CACHE_TTL = 24 * 60 * 60
+# Command paths resolved ahead of time by prewarm_commands(); None means missing
+_command_paths: Dict[str, Optional[str]] = {}
+# command_exists() results, kept per command so one can be forgotten on its own
+_exists_cache: Dict[str, bool] = {}
+# Standalone uv builds, named uv-<target>.tar.gz with a .sha256 alongside
+_UV_DOWNLOAD_URL = "https://github.com/astral-sh/uv/releases/latest/download/"
+_UV_TARGETS = {
+    ("linux", "x86_64"): "x86_64-unknown-linux-{libc}",
+    ("linux", "aarch64"): "aarch64-unknown-linux-{libc}",
+    ("linux", "arm64"): "aarch64-unknown-linux-{libc}",
+    ("darwin", "x86_64"): "x86_64-apple-darwin",
+    ("darwin", "arm64"): "aarch64-apple-darwin",
+}
+_UV_BINARIES = ("uv", "uvx")
 
 
 def run_command(
@@ -13,6 +52,7 @@ def run_command(
     check: bool = True,
     cwd: Optional[Path] = None,
     interactive: bool = False,
+    posix_spawn: bool = False,
 ) -> Tuple[bool, str, str]:
     """Run a command and return the result.
 
@@ -22,36 +62,35 @@ def run_command(
         check: Whether to raise on non-zero exit code
         cwd: Working directory for the command
         interactive: Whether to run in interactive mode (streams output, allows input)
+        posix_spawn: Start the command with posix_spawn instead of forking, by
+            letting it inherit this process's open file descriptors. Only for
+            short-lived commands such as ``--version`` probes.
 
     Returns:
         Tuple of (success, stdout, stderr)
     """
     try:
         if interactive:
-            # Interactive mode: stream output and allow input
-            process = subprocess.Popen(
-                command,
-                cwd=cwd,
-                text=True,
-                bufsize=1,
-                universal_newlines=True,
-            )
-            
-            # Wait for process to complete
-            return_code = process.wait()
-            
-            if check and return_code != 0:
-                raise subprocess.CalledProcessError(return_code, command)
-                
+            # Interactive mode: the command uses the terminal directly, so
+            # output streams and input works without any pipes
+            return_code = subprocess.run(command, cwd=cwd, check=check).returncode
             return return_code == 0, "", ""
         else:
             # Non-interactive mode: capture output
+            spawn_kwargs: Dict[str, Any] = {"cwd": cwd}
+            executable = _which(command[0]) if posix_spawn and cwd is None else None
+            if executable is not None:
+                # subprocess only starts the child with posix_spawn, rather
+                # than forking this interpreter, when given the executable's
+                # full path and no file descriptors need closing
+                command = [executable, *command[1:]]
+                spawn_kwargs = {"close_fds": False}
             result = subprocess.run(
                 command,
                 capture_output=capture_output,
                 text=True,
                 check=check,
-                cwd=cwd,
+                **spawn_kwargs,
             )
             return True, result.stdout.strip(), result.stderr.strip()
     except subprocess.CalledProcessError as e:
@@ -65,30 +104,32 @@ def run_command(
 
 
 def run_command_interactive(
-    command: List[str],
+    command: Union[List[str], str],
     cwd: Optional[Path] = None,
     show_command: bool = True,
 ) -> Tuple[bool, str, str]:
     """Run a command interactively, streaming output and allowing input.
     
     Args:
-        command: Command to run as a list of strings
+        command: Command to run as a list of strings, or a string to run
+            through the shell when it needs shell syntax such as ``&&``
         cwd: Working directory for the command
         show_command: Whether to show the command being executed
         
     Returns:
         Tuple of (success, stdout, stderr)
     """
-    cmd_str = " ".join(command)
+    shell = isinstance(command, str)
+    cmd_str = command if isinstance(command, str) else " ".join(command)
     
     if show_command:
         print(f"$ {cmd_str}")
     
     try:
-        # Use shell=True for simplicity and full interactivity
+        # Argument lists are executed directly, without an intermediate shell
         result = subprocess.run(
-            cmd_str,
-            shell=True,
+            command,
+            shell=shell,
             cwd=cwd,
             text=True,
         )
@@ -99,34 +140,258 @@ def run_command_interactive(
         return False, "", f"Error running command: {e}"
 
 
+def run_command_streaming(
+    command: List[str],
+    on_line: Callable[[str], None],
+    cwd: Optional[Path] = None,
+) -> Tuple[bool, str, str]:
+    """Run a command, handing each line of its output to a callback.
+
+    stderr is merged into stdout, so lines arrive in the order the command
+    wrote them and a single pipe can't fill up unread.
+
+    Args:
+        command: Command to run as a list of strings
+        on_line: Called with each line of output as it is produced
+        cwd: Working directory for the command
+
+    Returns:
+        Tuple of (success, output, error)
+    """
+    try:
+        with subprocess.Popen(
+            command,
+            cwd=cwd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+        ) as process:
+            lines = []
+            for line in cast(IO[str], process.stdout):
+                lines.append(line)
+                on_line(line.rstrip("\n"))
+            return_code = process.wait()
+    except FileNotFoundError:
+        return False, "", f"Command not found: {command[0]}"
+    return return_code == 0, "".join(lines).strip(), ""
+
+
+def prewarm_commands(commands: Iterable[str]) -> None:
+    """Resolve several commands ahead of the steps that need them.
+
+    The lookups share the PATH index built by the first of them, and later
+    ``command_exists()`` calls are answered from the result. On Windows,
+    where executables need PATHEXT handling, this does nothing.
+
+    Args:
+        commands: Command names to look up
+    """
+    if os.name == "nt":
+        return
+    for cmd in commands:
+        if cmd not in _command_paths:
+            _command_paths[cmd] = _find_in_path_index(cmd)
+
+
+@functools.lru_cache(maxsize=4)
+def _split_path(path: str) -> Tuple[str, ...]:
+    """Split a PATH value into its directories, without duplicates."""
+    return tuple(dict.fromkeys(d or os.curdir for d in path.split(os.pathsep)))
+
+
+@functools.lru_cache(maxsize=1)
+def _path_index(path: str) -> Dict[str, List[str]]:
+    """Map every file name in the PATH directories to its paths, in PATH order.
+
+    Each directory is listed once with ``os.scandir``. Entries aren't
+    stat'ed, so a name may also map to a directory or a non-executable.
+    """
+    index: Dict[str, List[str]] = {}
+    for directory in _split_path(path):
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    index.setdefault(entry.name, []).append(entry.path)
+        except OSError:
+            continue
+    return index
+
+
+def _find_in_path_index(command: str) -> Optional[str]:
+    """Find the first executable with this name in the PATH index."""
+    index = _path_index(os.environ.get("PATH", os.defpath))
+    for candidate in index.get(command, ()):
+        if os.access(candidate, os.X_OK) and not os.path.isdir(candidate):
+            return candidate
+    return None
+
+
+def _search_path(command: str) -> Optional[str]:
+    """Find an executable on PATH the way ``shutil.which`` does on POSIX.
+
+    PATH is indexed once, so each lookup is a dictionary lookup plus an
+    ``access()`` call for each file of that name. Windows, where PATHEXT
+    decides which files are executable, and commands given with a directory
+    use ``shutil.which``.
+    """
+    if os.name == "nt" or os.path.dirname(command):
+        return shutil.which(command)
+    return _find_in_path_index(command)
+
+
+def _which(command: str) -> Optional[str]:
+    """Find a command, preferring a path resolved by prewarm_commands()."""
+    if command in _command_paths:
+        return _command_paths[command]
+    return _search_path(command)
+
+
 def command_exists(command: str) -> bool:
     """Check if a command exists on the system.
 
+    Results are cached for the life of the process; call ``forget_command()``
+    after installing a command.
+
     Args:
         command: Command name to check
 
     Returns:
         True if command exists, False otherwise
     """
-    return shutil.which(command) is not None
+    exists = _exists_cache.get(command)
+    if exists is None:
+        exists = _which(command) is not None
+        _exists_cache[command] = exists
+    return exists
+
+
+def forget_command(command: str) -> None:
+    """Forget the cached lookup of one command, e.g. after installing it.
+
+    Args:
+        command: Command name to look up afresh next time
+    """
+    _command_paths.pop(command, None)
+    _exists_cache.pop(command, None)
+    # The command was probably just installed into a PATH directory
+    _path_index.cache_clear()
+
+
+def remember_command(command: str, path: str) -> None:
+    """Record where a command is, e.g. after installing it to a known path.
+
+    Later ``command_exists()`` calls, and commands run through
+    ``run_command()``, use this path without searching PATH.
+
+    Args:
+        command: Command name
+        path: Absolute path of the executable
+    """
+    _command_paths[command] = path
+    _exists_cache[command] = True
+
+
+def _run_probes(commands: List[str]) -> Dict[str, Optional[str]]:
+    """Run ``--version`` for each command."""
+    versions: Dict[str, Optional[str]] = {}
+    for cmd in commands:
+        success, stdout, _ = run_command([cmd, "--version"], posix_spawn=True)
+        versions[cmd] = stdout if success else None
+    return versions
+
+
+def _binary_signature(command: str) -> Optional[List[Any]]:
+    """Identify the binary a command resolves to by its path and mtime."""
+    path = _which(command)
+    if path is None:
+        return None
+    try:
+        return [path, os.stat(path).st_mtime_ns]
+    except OSError:
+        return None
+
+
+def _probe_is_fresh(entry: Any, signature: Optional[List[Any]], now: float) -> bool:
+    """Check a cached probe is for this binary, recent and well-formed.
+
+    The cache file may have been edited or written by another version, so
+    an entry of any other shape counts as a miss rather than an error.
+    """
+    if signature is None or not isinstance(entry, dict):
+        return False
+    captured_at = entry.get("captured_at")
+    version = entry.get("version")
+    return (
+        entry.get("binary") == signature
+        and isinstance(captured_at, (int, float))
+        and (version is None or isinstance(version, str))
+        and now - captured_at < _PROBE_CACHE_TTL
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def _probe_versions() -> Dict[str, Optional[str]]:
+    versions: Dict[str, Optional[str]] = dict.fromkeys(_VERSION_PROBES)
+    found = [cmd for cmd in _VERSION_PROBES if command_exists(cmd)]
+
+    cached = cache.read_json(_PROBE_CACHE_FILE)
+    if not isinstance(cached, dict):
+        cached = {}
+    now = time.time()
+    signatures = {cmd: _binary_signature(cmd) for cmd in found}
+
+    missing = []
+    for cmd in found:
+        entry: Any = cached.get(cmd)
+        if _probe_is_fresh(entry, signatures[cmd], now):
+            versions[cmd] = entry["version"]
+        else:
+            missing.append(cmd)
+
+    if missing:
+        versions.update(_run_probes(missing))
+        for cmd in missing:
+            if signatures[cmd] is not None:
+                cached[cmd] = {
+                    "binary": signatures[cmd],
+                    "version": versions[cmd],
+                    "captured_at": now,
+                }
+        cache.write_json(_PROBE_CACHE_FILE, cached)
+
+    return versions
+
+
+def probe_versions() -> Dict[str, Optional[str]]:
+    """Get the ``--version`` output of Node.js.
+
+    Results are kept in ``probe.json`` in the WR CLI cache directory and
+    reused for 24 hours as long as each command still resolves to the same
+    binary with the same modification time. Within a process the result is
+    also cached until ``clear_command_cache()``.
+
+    Returns:
+        Dictionary mapping command name to its version output, or None if
+        the command is missing or printed nothing
+    """
+    # Parallel setup steps probe at the same time; only the first one spawns
+    with _probe_lock:
+        return _probe_versions()
 
 
 def get_python_executable() -> Optional[str]:
     """Get the path to the Python executable.
 
+    WR CLI requires Python 3.11+ itself, so the interpreter running it is
+    used without spawning anything.
+
     Returns:
-        Path to Python executable, or None if not found
-    """
-    # Try different Python command variations
-    for cmd in ["python3.11", "python3", "python"]:
-        if command_exists(cmd):
-            # Verify it's actually Python 3.11+
-            success, stdout, _ = run_command([cmd, "--version"])
-            if success and "Python 3.1" in stdout:
-                return cmd
-    return None
+        Path to Python executable, or None if it can't be determined
+    """
+    return sys.executable or None
 
 
+@functools.lru_cache(maxsize=None)
 def get_node_version() -> Optional[str]:
     """Get the installed Node.js version.
 
@@ -136,8 +401,89 @@ def get_node_version() -> Optional[str]:
     if not command_exists("node"):
         return None
 
-    success, stdout, _ = run_command(["node", "--version"])
-    return stdout if success else None
+    return probe_versions()["node"]
+
+
+def clear_command_cache() -> None:
+    """Forget cached command lookups so newly installed commands are found."""
+    _command_paths.clear()
+    _exists_cache.clear()
+    _path_index.cache_clear()
+    _probe_versions.cache_clear()
+    get_node_version.cache_clear()
+
+
+def clear_version_cache() -> None:
+    """Forget version probes both in memory and on disk, e.g. for ``--force``."""
+    cache.remove(_PROBE_CACHE_FILE)
+    clear_command_cache()
+
+
+def uv_release_target() -> Optional[str]:
+    """Get the uv release build matching this system.
+
+    Returns:
+        Target triple such as ``x86_64-unknown-linux-gnu``, or None if uv
+        doesn't publish a standalone build for this system
+    """
+    target = _UV_TARGETS.get((platform.system().lower(), platform.machine().lower()))
+    if target is None:
+        return None
+    libc = "gnu" if platform.libc_ver()[0] == "glibc" else "musl"
+    return target.format(libc=libc)
+
+
+def install_uv_release(target: str, bin_dir: Path) -> List[Path]:
+    """Download a uv release build, verify it and unpack its binaries.
+
+    Args:
+        target: Target triple from ``uv_release_target()``
+        bin_dir: Directory to install ``uv`` and ``uvx`` into
+
+    Returns:
+        Paths of the installed binaries
+
+    Raises:
+        OSError: If the download or the install fails
+        ValueError: If the archive doesn't match its published checksum
+    """
+    # Only needed when uv is missing, so kept off the import path of every run
+    import hashlib
+    import io
+    import tarfile
+    import urllib.request
+    from pathlib import PurePosixPath
+
+    archive = f"uv-{target}.tar.gz"
+    with urllib.request.urlopen(_UV_DOWNLOAD_URL + archive, timeout=60) as response:
+        data = response.read()
+    with urllib.request.urlopen(
+        _UV_DOWNLOAD_URL + archive + ".sha256", timeout=60
+    ) as response:
+        expected = response.read().decode().split()[0]
+    if hashlib.sha256(data).hexdigest() != expected:
+        raise ValueError(f"Checksum mismatch for {archive}")
+
+    bin_dir.mkdir(parents=True, exist_ok=True)
+    installed = []
+    with tarfile.open(fileobj=io.BytesIO(data), mode="r:gz") as tar:
+        for member in tar.getmembers():
+            # Only the binaries are wanted, so their directory is ignored
+            name = PurePosixPath(member.name).name
+            source = tar.extractfile(member) if member.isfile() else None
+            if source is None or name not in _UV_BINARIES:
+                continue
+            path = bin_dir / name
+            tmp_path = bin_dir / f".{name}.tmp"
+            with open(tmp_path, "wb") as f:
+                shutil.copyfileobj(source, f)
+            tmp_path.chmod(0o755)
+            os.replace(tmp_path, path)
+            installed.append(path)
+
+    if bin_dir / "uv" not in installed:
+        raise ValueError(f"{archive} does not contain uv")
+    return installed
 
 
 def get_system_info() -> Dict[str, str]: